@@ -6,9 +6,150 @@ Supports chunking large training logs into manageable pieces.
 """
 
 import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import accumulate
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from json_io import list_json_files, load_json
+
+
+# Files needed before aggregation uses a process pool by default. Starting
+# and joining a pool costs about 10 ms, and summarizing a parsed activity
+# takes about as long (a 6000-trackpoint file measured ~10 ms), so with two
+# or more CPUs the pool pays for itself after a handful of files
+PARALLEL_MIN_FILES = 8
+
+
+def _encode_json(obj, indent: bool = True) -> bytes:
+    """Encode obj as UTF-8 JSON bytes (compact unless indent), using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'),
+                      ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _dump_json(obj, path: Path, indent: bool = True):
+    """Write obj as UTF-8 JSON (indented by default)."""
+    Path(path).write_bytes(_encode_json(obj, indent))
+
+
+def _activity_separator(pretty: bool) -> bytes:
+    """Separator between encoded activities inside an "activities" array."""
+    return b',\n' if pretty else b','
+
+
+def _encode_activity(activity_summary: dict, jsonl: bool = False, pretty: bool = True) -> bytes:
+    """
+    Encode one activity summary for a training log.
+
+    Args:
+        activity_summary: Activity summary dictionary
+        jsonl: Encode as a single JSON Lines record instead of an element
+            of an "activities" array
+        pretty: Indent the element to its depth in an indented log
+            (otherwise it is encoded compactly)
+
+    Returns:
+        Encoded activity (without trailing newline or separator)
+    """
+    if jsonl or not pretty:
+        return _encode_json(activity_summary, indent=False)
+    # Shift the lines to the array's nesting depth; JSON strings never hold
+    # raw newlines, so only indentation is affected
+    return b'    ' + _encode_json(activity_summary).replace(b'\n', b'\n    ')
+
+
+def _write_log(path, metadata: dict, activities, pretty: bool = True):
+    """
+    Write a {"metadata": ..., "activities": [...]} training log.
+
+    The output is the same as _dump_json on the full log (with indent=pretty),
+    but each activity is encoded only once, up front, and copied in as bytes.
+
+    Args:
+        path: Output file path
+        metadata: Log metadata dictionary
+        activities: Activities encoded with _encode_activity (with the same
+            pretty setting), either as a list or as a non-empty binary file
+            holding them already joined with _activity_separator (copied
+            from its current position)
+        pretty: Write an indented log instead of compact JSON
+    """
+    with open(path, 'wb') as f:
+        if pretty:
+            head = b'{\n  "metadata": ' + _encode_json(metadata).replace(b'\n', b'\n  ')
+            empty = b',\n  "activities": []\n}'
+            open_array, close_array = b',\n  "activities": [\n', b'\n  ]\n}'
+        else:
+            head = b'{"metadata":' + _encode_json(metadata, indent=False)
+            empty = b',"activities":[]}'
+            open_array, close_array = b',"activities":[', b']}'
+
+        f.write(head)
+        if isinstance(activities, list) and not activities:
+            f.write(empty)
+            return
+        f.write(open_array)
+        if isinstance(activities, list):
+            f.write(_activity_separator(pretty).join(activities))
+        else:
+            shutil.copyfileobj(activities, f)
+        f.write(close_array)
+
+
+def iter_activities(log_file):
+    """
+    Iterate over the activities of a training log.
+
+    JSON Lines logs (.jsonl) are read one line at a time. For JSON logs the
+    "activities" array is streamed with ijson when it is installed, so only
+    one activity is in memory at a time; otherwise the file is loaded whole.
+
+    Args:
+        log_file: Path to a training log or chunk file (.json or .jsonl)
+
+    Yields:
+        Activity summary dictionaries, in file order
+    """
+    path = Path(log_file)
+
+    if path.suffix == '.jsonl':
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        return
+
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'activities.item', use_float=True)
+        return
+
+    yield from load_json(path)['activities']
+
 
 def create_chunks(activities: list, chunk_size: int) -> list:
     """
@@ -28,49 +169,135 @@ def create_chunks(activities: list, chunk_size: int) -> list:
             for i in range(0, len(activities), chunk_size)]
 
 
-def calculate_chunk_statistics(activities: list) -> dict:
+_TIME_RE = re.compile(r'\s*(\d+):(\d+):(\d+)\s*$')
+
+
+def _parse_hms(time_str) -> int:
+    """Convert an HH:MM:SS string to seconds (0 if it is not one)."""
+    if not isinstance(time_str, str):
+        return 0
+    match = _TIME_RE.match(time_str)
+    if match is None:
+        return 0
+    h, m, s = match.groups()
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def _to_number(value, kind):
+    """Convert a summary value with kind (float or int), 0 if it is not numeric."""
+    if not isinstance(value, (int, float, str)):
+        return 0
+    try:
+        return kind(value)
+    except (ValueError, OverflowError):
+        # Only values the CSV parser could not convert end up here
+        return 0
+
+
+def _summary_totals(summary: dict) -> tuple:
     """
-    Calculate statistics for a chunk of activities.
+    Extract distance, calories and time from a CSV summary.
 
     Args:
-        activities: List of activity dictionaries
+        summary: CSV summary dictionary of a single activity
 
     Returns:
-        Dictionary with chunk statistics
+        Tuple of (distance_m, calories, time_seconds) as integers; unparseable
+        values count as 0. Distance is kept in whole metres so totals add up
+        exactly instead of drifting as floating point kilometres.
     """
-    total_distance = 0
-    total_time_seconds = 0
-    total_calories = 0
-
-    for activity in activities:
-        # Extract CSV summary data if available
-        if 'summary' in activity:
-            summary = activity['summary']
-            try:
-                total_distance += float(summary.get('getdistance', 0))
-            except:
-                pass
-            try:
-                total_calories += int(summary.get('calories', 0))
-            except:
-                pass
-            try:
-                time_str = summary.get('time', '00:00:00')
-                parts = time_str.strip().split(':')
-                if len(parts) == 3:
-                    h, m, s = map(int, parts)
-                    total_time_seconds += h * 3600 + m * 60 + s
-            except:
-                pass
+    distance_km = _to_number(summary.get('getdistance'), float)
+    return (
+        round(distance_km * 1000) if math.isfinite(distance_km) else 0,
+        _to_number(summary.get('calories'), int),
+        _parse_hms(summary.get('time'))
+    )
+
+
+def _fmt_hms(seconds: int) -> str:
+    """Format a number of seconds as HH:MM:SS."""
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _format_statistics(distance_m: int, calories: int, time_seconds: int, count: int) -> dict:
+    """
+    Build a statistics dictionary from summed totals.
+
+    Args:
+        distance_m: Total distance in metres
+        calories: Total calories
+        time_seconds: Total time in seconds
+        count: Number of activities the totals cover
 
+    Returns:
+        Dictionary with statistics
+    """
     return {
-        'total_distance_km': round(total_distance, 2),
-        'total_time_formatted': f"{total_time_seconds // 3600:02d}:{(total_time_seconds % 3600) // 60:02d}:{total_time_seconds % 60:02d}",
-        'total_calories': total_calories,
-        'average_distance_per_run': round(total_distance / len(activities), 2) if activities else 0
+        'total_distance_km': round(distance_m / 1000, 2),
+        'total_time_seconds': time_seconds,
+        'total_time_formatted': _fmt_hms(time_seconds),
+        'total_calories': calories,
+        'average_distance_per_run': round(distance_m / count / 1000, 2) if count else 0
     }
 
 
+def _add_totals(a: tuple, b: tuple) -> tuple:
+    """Add two (distance_m, calories, time_seconds) tuples."""
+    return a[0] + b[0], a[1] + b[1], a[2] + b[2]
+
+
+def _prefix_totals(totals: list) -> list:
+    """
+    Running sums of per-activity totals.
+
+    Element i holds the sum of totals[:i], so the totals of any slice
+    [i:j] are prefix[j] - prefix[i] without walking the slice again.
+
+    Args:
+        totals: List of (distance_m, calories, time_seconds) tuples
+
+    Returns:
+        List of len(totals) + 1 summed tuples, starting at (0, 0, 0)
+    """
+    prefix = [(0, 0, 0)]
+    prefix.extend(accumulate(totals, _add_totals))
+    return prefix
+
+
+def _statistics(totals: list) -> dict:
+    """
+    Build statistics from per-activity totals.
+
+    Args:
+        totals: List of (distance_m, calories, time_seconds) tuples, one per activity
+
+    Returns:
+        Dictionary with statistics
+    """
+    distance_m, calories, time_seconds = _prefix_totals(totals)[-1]
+    return _format_statistics(distance_m, calories, time_seconds, len(totals))
+
+
+def calculate_chunk_statistics(activities) -> dict:
+    """
+    Calculate statistics for a chunk of activities.
+
+    Args:
+        activities: Iterable of activity dictionaries (a list or a stream,
+            e.g. activities read line by line from a JSON Lines log)
+
+    Returns:
+        Dictionary with chunk statistics
+    """
+    # Extract CSV summary data if available
+    return _statistics([
+        _summary_totals(activity['summary']) if 'summary' in activity else (0, 0, 0)
+        for activity in activities
+    ])
+
+
 def create_index_file(chunks_info: list, output_file: str):
     """
     Create an index file describing all chunks.
@@ -89,18 +316,357 @@ def create_index_file(chunks_info: list, output_file: str):
         "chunks": chunks_info
     }
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
+    _dump_json(index, output_file)
 
     print(f"✓ Index file created: {output_file}")
 
 
+def _count_trackpoints(trackpoints) -> int:
+    """Count TCX trackpoints stored as a list of points or in the columnar layout."""
+    if isinstance(trackpoints, dict):
+        columns = trackpoints.get('data')
+        return len(columns[0]) if columns else 0
+    return len(trackpoints)
+
+
+# Placeholder for activity summary keys that have not been filled in
+_UNSET = object()
+_OPTIONAL_SUMMARY_KEYS = ('summary', 'splits', 'tcx_metadata')
+
+
+def _summarize_activity(activity_data: dict) -> dict:
+    """
+    Extract the key information for AI analysis from a parsed activity.
+
+    Args:
+        activity_data: Parsed activity as written by parse_coros_data.py
+
+    Returns:
+        Activity summary dictionary for the training log
+    """
+    # Allocate every key up front so the dict is sized once, then drop the
+    # slots this activity has no data for. The whole sources tree is copied
+    # into the log as raw_data_files, so every input byte is needed: an
+    # ijson prefix walk would decode the same data several times slower
+    # than a full orjson load, and orjson.Fragment pass-through would need
+    # byte offsets for the subtree, which ijson does not report.
+    sources = activity_data['sources']
+    activity_summary = {
+        "date": activity_data['date'],
+        "metadata": activity_data.get('metadata', {}),
+        "raw_data_files": sources,
+        "summary": _UNSET,
+        "splits": _UNSET,
+        "tcx_metadata": _UNSET
+    }
+
+    # Add CSV summary if available
+    csv_source = sources.get('csv')
+    if csv_source is not None and 'data' in csv_source:
+        csv_data = csv_source['data']
+
+        if 'summary' in csv_data:
+            activity_summary['summary'] = csv_data['summary']
+
+        if 'splits' in csv_data:
+            activity_summary['splits'] = csv_data['splits']
+
+    # Add TCX metadata
+    tcx_source = sources.get('tcx')
+    if tcx_source is not None and 'data' in tcx_source:
+        tcx_data = tcx_source['data']
+        trackpoints = tcx_data.get('trackpoints', [])
+        activity_summary['tcx_metadata'] = {
+            'activity_type': tcx_data.get('activity_type'),
+            'activity_id': tcx_data.get('activity_id'),
+            'total_trackpoints': _count_trackpoints(trackpoints),
+            'total_laps': len(tcx_data.get('laps', []))
+        }
+
+        # Optionally include GPS track for route analysis
+        # Note: Commenting this out to keep file size manageable
+        # Uncomment if you want full GPS data in the training log
+        # activity_summary['gps_track'] = trackpoints
+
+    for key in _OPTIONAL_SUMMARY_KEYS:
+        if activity_summary[key] is _UNSET:
+            del activity_summary[key]
+
+    return activity_summary
+
+
+def _parse_one(json_file: Path, jsonl: bool = False, pretty: bool = True) -> tuple:
+    """
+    Load one parsed activity file, summarize it and encode the summary.
+
+    Top-level so it can run in a worker process; returning the encoded
+    summary keeps both the JSON encoding and the transfer back cheap.
+
+    Args:
+        json_file: Path to a parsed activity JSON file
+        jsonl: Encode the summary as a JSON Lines record
+        pretty: Encode the summary for an indented log
+
+    Returns:
+        Tuple of (date, encoded_summary, (distance_m, calories, time_seconds),
+        error). If the file is empty or not a parsed activity, the first three
+        are None and error holds the reason; otherwise error is None.
+    """
+    try:
+        # Loaded whole even when ijson is installed: the summary keeps the
+        # full sources tree (see _summarize_activity)
+        activity_summary = _summarize_activity(load_json(json_file))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        return None, None, None, f"{json_file.name}: {type(e).__name__}: {e}"
+
+    if 'summary' in activity_summary:
+        totals = _summary_totals(activity_summary['summary'])
+    else:
+        totals = (0, 0, 0)
+    return activity_summary['date'], _encode_activity(activity_summary, jsonl, pretty), totals, None
+
+
+def _collect(json_files: list, workers: int = None, jsonl: bool = False, sink=None,
+             pretty: bool = True) -> tuple:
+    """
+    Parse and encode all activity files, in order.
+
+    Files that cannot be parsed are reported and skipped.
+
+    Args:
+        json_files: Sorted list of parsed activity files
+        workers: Number of processes used to parse files (default: one per
+            CPU when there are at least PARALLEL_MIN_FILES files; 1 = serial)
+        jsonl: Encode activities as JSON Lines records
+        sink: Binary file the encoded activities are written to as soon as
+            they are parsed (one per line with jsonl, otherwise joined with
+            _activity_separator); when None they are returned instead
+        pretty: Encode activities for an indented log
+
+    Returns:
+        Tuple of (parsed_files, dates, encoded_activities, totals);
+        encoded_activities stays empty when a sink is given
+    """
+    parsed_files = []
+    dates = []
+    encoded_activities = []
+    totals = []
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(json_files) >= PARALLEL_MIN_FILES else 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    separator = _activity_separator(pretty)
+
+    try:
+        parse = partial(_parse_one, jsonl=jsonl, pretty=pretty)
+        if executor is not None:
+            results = executor.map(parse, json_files, chunksize=16)
+        else:
+            results = map(parse, json_files)
+
+        for json_file, (date, encoded, activity_totals, error) in zip(json_files, results):
+            if error is not None:
+                print(f"  ⚠ Skipping {error}")
+                continue
+
+            if sink is None:
+                encoded_activities.append(encoded)
+            elif jsonl:
+                sink.write(encoded)
+                sink.write(b'\n')
+            else:
+                if totals:
+                    sink.write(separator)
+                sink.write(encoded)
+
+            parsed_files.append(json_file)
+            dates.append(date)
+            totals.append(activity_totals)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return parsed_files, dates, encoded_activities, totals
+
+
+def _overall_statistics(parsed_files: list, prefix: list) -> dict:
+    """Statistics for the whole log from the running totals of all activities."""
+    statistics = _format_statistics(*prefix[-1], len(parsed_files))
+    statistics['date_range'] = {
+        'first_activity': parsed_files[0].stem if parsed_files else None,
+        'last_activity': parsed_files[-1].stem if parsed_files else None
+    }
+    return statistics
+
+
+def _print_statistics(title: str, count: int, statistics: dict):
+    """Print statistics for the console summary."""
+    print(f"\n{title}:")
+    print(f"  Total Activities: {count}")
+    print(f"  Total Distance:   {statistics['total_distance_km']} km")
+    print(f"  Total Time:       {_fmt_hms(statistics['total_time_seconds'])}")
+    print(f"  Total Calories:   {statistics['total_calories']} kcal")
+    print(f"  Avg Distance:     {statistics['average_distance_per_run']} km/run")
+
+
+def _write_single_log(json_files: list, output_path: Path, workers: int = None,
+                      pretty: bool = False, collected: tuple = None):
+    """
+    Write all activities to one training log file.
+
+    When collected (the result of _collect for json_files) is given, those
+    already parsed activities are written instead of parsing the files again.
+    """
+    if collected is not None:
+        _finish_single_log(output_path, collected, collected[2], pretty)
+        return
+
+    # Activities are spooled to disk as they are parsed and copied in
+    # after the metadata once the statistics are known
+    with tempfile.TemporaryFile() as spool:
+        collected = _collect(json_files, workers, sink=spool, pretty=pretty)
+        spool.seek(0)
+        _finish_single_log(output_path, collected, spool, pretty)
+
+
+def _finish_single_log(output_path: Path, collected: tuple, activities, pretty: bool):
+    """Write the single training log for collected activities and report it."""
+    parsed_files, _, _, totals = collected
+    overall_statistics = _overall_statistics(parsed_files, _prefix_totals(totals))
+
+    metadata = {
+        "athlete_name": "Training Log",
+        "created_at": datetime.now().isoformat(),
+        "total_activities": len(parsed_files),
+        "data_source": "Coros Running Watch",
+        "purpose": "AI Training Coach Analysis",
+        "statistics": overall_statistics
+    }
+
+    # Save consolidated training log
+    _write_log(output_path, metadata, activities if parsed_files else [], pretty)
+
+    print(f"\n✓ Training log created: {output_path}")
+    _print_statistics("STATISTICS", len(parsed_files), overall_statistics)
+    print(f"\nThis file is ready to be provided to an AI training coach for analysis!")
+
+
+def _write_jsonl_log(json_files: list, output_path: Path, workers: int = None):
+    """Stream all activities to a JSON Lines file with a metadata sidecar."""
+    jsonl_path = output_path.with_suffix('.jsonl')
+    meta_path = output_path.with_suffix('.meta.json')
+
+    with open(jsonl_path, 'wb') as stream:
+        parsed_files, _, _, totals = _collect(json_files, workers, jsonl=True, sink=stream)
+    overall_statistics = _overall_statistics(parsed_files, _prefix_totals(totals))
+
+    # Activities are already on disk; only the metadata is left to write
+    _dump_json({
+        "metadata": {
+            "athlete_name": "Training Log",
+            "created_at": datetime.now().isoformat(),
+            "total_activities": len(parsed_files),
+            "data_source": "Coros Running Watch",
+            "purpose": "AI Training Coach Analysis",
+            "activities_file": jsonl_path.name,
+            "statistics": overall_statistics
+        }
+    }, meta_path)
+
+    print(f"\n✓ Training log created: {jsonl_path} (metadata: {meta_path})")
+    _print_statistics("STATISTICS", len(parsed_files), overall_statistics)
+
+
+def _write_chunked_log(collected: tuple, chunk_size: int, chunk_pattern: str,
+                       chunks_dir: str, pretty: bool = False):
+    """Write collected activities to chunk files of chunk_size each plus an index file."""
+    parsed_files, dates, encoded_activities, totals = collected
+
+    # The running sums give the overall and every chunk's statistics
+    # without another pass over the activities
+    prefix = _prefix_totals(totals)
+    overall_statistics = _overall_statistics(parsed_files, prefix)
+
+    # Create chunks
+    chunk_ranges = create_chunks(range(len(encoded_activities)), chunk_size)
+    chunks_info = []
+
+    # Create chunks directory; chunk files are joined onto the plain
+    # string instead of building a Path per chunk
+    chunks_str = str(chunks_dir)
+    os.makedirs(chunks_str, exist_ok=True)
+
+    print(f"\nCreating {len(chunk_ranges)} chunks with ~{chunk_size} activities each...")
+    print(f"Storing chunks in: {os.path.abspath(chunks_str)}")
+
+    # All chunks belong to the same run, so they share one timestamp
+    created_at = datetime.now().isoformat()
+
+    for idx, chunk in enumerate(chunk_ranges, start=1):
+        first, last = chunk[0], chunk[-1] + 1
+
+        # Calculate chunk statistics
+        end_totals, start_totals = prefix[last], prefix[first]
+        chunk_stats = _format_statistics(
+            end_totals[0] - start_totals[0],
+            end_totals[1] - start_totals[1],
+            end_totals[2] - start_totals[2],
+            last - first
+        )
+
+        # Create chunk training log
+        chunk_metadata = {
+            "athlete_name": "Training Log",
+            "created_at": created_at,
+            "chunk_number": idx,
+            "total_chunks": len(chunk_ranges),
+            "total_activities": len(chunk),
+            "data_source": "Coros Running Watch",
+            "purpose": "AI Training Coach Analysis (Chunk)",
+            "statistics": chunk_stats
+        }
+
+        # Determine chunk file name
+        chunk_filename = chunk_pattern.format(idx)
+        chunk_file_path = os.path.join(chunks_str, chunk_filename)
+
+        # Save chunk file
+        _write_log(chunk_file_path, chunk_metadata, encoded_activities[first:last], pretty)
+
+        print(f"  ✓ Chunk {idx}/{len(chunk_ranges)}: {chunk_filename} ({len(chunk)} activities)")
+
+        # Track chunk info for index
+        chunks_info.append({
+            "file": chunk_filename,  # Use just the filename, not full path
+            "chunk_number": idx,
+            "activity_count": len(chunk),
+            "date_range": {
+                "first_activity": dates[first],
+                "last_activity": dates[last - 1]
+            },
+            "statistics": chunk_stats
+        })
+
+    # Create index file in chunks directory
+    index_filename = 'training_log_index.json'
+    index_file = os.path.join(chunks_str, index_filename)
+    create_index_file(chunks_info, index_file)
+
+    print(f"\n✓ Created {len(chunk_ranges)} chunk files")
+    _print_statistics("OVERALL STATISTICS", len(parsed_files), overall_statistics)
+    print(f"\nChunk files are ready to be provided to an AI training coach for analysis!")
+
+
 def aggregate_training_data(
     parsed_dir: str = "./parsed_data",
     output_file: str = "training_log.json",
     chunk_size: int = 5,
     chunk_pattern: str = "training_log_part{}.json",
-    chunks_dir: str = "training_log_chunks"
+    chunks_dir: str = "training_log_chunks",
+    jsonl: bool = False,
+    workers: int = None,
+    pretty: bool = False
 ):
     """
     Aggregate all parsed activities into a training log optimized for AI analysis.
@@ -111,6 +677,13 @@ def aggregate_training_data(
         chunk_size: Number of activities per chunk (0 = no chunking, default: 5)
         chunk_pattern: File pattern for chunks (e.g., "training_log_part{}.json")
         chunks_dir: Directory to store chunk files (default: "training_log_chunks")
+        jsonl: Stream activities to a JSON Lines file (one activity per line)
+            next to a small metadata sidecar instead of building one JSON
+            document in memory (chunking is ignored in this mode)
+        workers: Number of processes used to parse files (default: one per
+            CPU when there are at least PARALLEL_MIN_FILES files; 1 = serial)
+        pretty: Indent the training log and chunk files; by default they are
+            written as compact JSON, which is smaller and faster to write
     """
     data_dir = Path(parsed_dir)
 
@@ -118,189 +691,35 @@ def aggregate_training_data(
         print(f"Error: Directory {data_dir} does not exist")
         return
 
-    json_files = sorted(data_dir.glob('*.json'))
+    json_files = list_json_files(data_dir)
 
     if not json_files:
         print(f"No JSON files found in {data_dir}")
         return
 
-    # Aggregate all activities first
-    activities = []
-    total_distance = 0
-    total_time_seconds = 0
-    total_calories = 0
-
     print(f"Aggregating {len(json_files)} activities...")
 
-    for json_file in json_files:
-        with open(json_file, 'r') as f:
-            activity_data = json.load(f)
-
-        # Extract key information for AI analysis
-        activity_summary = {
-            "date": activity_data['date'],
-            "metadata": activity_data.get('metadata', {}),
-            "raw_data_files": activity_data['sources']
-        }
-
-        # Add CSV summary if available
-        if 'csv' in activity_data['sources'] and 'data' in activity_data['sources']['csv']:
-            csv_data = activity_data['sources']['csv']['data']
-
-            if 'summary' in csv_data:
-                summary = csv_data['summary']
-                activity_summary['summary'] = summary
-
-                # Track totals
-                try:
-                    total_distance += float(summary.get('getdistance', 0))
-                except:
-                    pass
-                try:
-                    total_calories += int(summary.get('calories', 0))
-                except:
-                    pass
-                try:
-                    time_str = summary.get('time', '00:00:00')
-                    parts = time_str.strip().split(':')
-                    if len(parts) == 3:
-                        h, m, s = map(int, parts)
-                        total_time_seconds += h * 3600 + m * 60 + s
-                except:
-                    pass
-
-            if 'splits' in csv_data:
-                activity_summary['splits'] = csv_data['splits']
-
-        # Add TCX metadata
-        if 'tcx' in activity_data['sources'] and 'data' in activity_data['sources']['tcx']:
-            tcx_data = activity_data['sources']['tcx']['data']
-            activity_summary['tcx_metadata'] = {
-                'activity_type': tcx_data.get('activity_type'),
-                'activity_id': tcx_data.get('activity_id'),
-                'total_trackpoints': len(tcx_data.get('trackpoints', [])),
-                'total_laps': len(tcx_data.get('laps', []))
-            }
-
-            # Optionally include GPS track for route analysis
-            # Note: Commenting this out to keep file size manageable
-            # Uncomment if you want full GPS data in the training log
-            # activity_summary['gps_track'] = tcx_data.get('trackpoints', [])
-
-        activities.append(activity_summary)
-
-    # Calculate overall statistics
-    overall_statistics = {
-        'total_distance_km': round(total_distance, 2),
-        'total_time_formatted': f"{total_time_seconds // 3600:02d}:{(total_time_seconds % 3600) // 60:02d}:{total_time_seconds % 60:02d}",
-        'total_calories': total_calories,
-        'average_distance_per_run': round(total_distance / len(json_files), 2) if json_files else 0,
-        'date_range': {
-            'first_activity': json_files[0].stem if json_files else None,
-            'last_activity': json_files[-1].stem if json_files else None
-        }
-    }
+    output_path = Path(output_file)
 
+    if jsonl:
+        _write_jsonl_log(json_files, output_path, workers)
     # Check if chunking is requested
-    if chunk_size > 0 and len(activities) > chunk_size:
-        # Create chunks
-        chunks = create_chunks(activities, chunk_size)
-        chunks_info = []
-
-        # Create chunks directory
-        chunks_path = Path(chunks_dir)
-        chunks_path.mkdir(parents=True, exist_ok=True)
-
-        print(f"\nCreating {len(chunks)} chunks with ~{chunk_size} activities each...")
-        print(f"Storing chunks in: {chunks_path.absolute()}")
-
-        for idx, chunk in enumerate(chunks, start=1):
-            # Create chunk training log
-            chunk_log = {
-                "metadata": {
-                    "athlete_name": "Training Log",
-                    "created_at": datetime.now().isoformat(),
-                    "chunk_number": idx,
-                    "total_chunks": len(chunks),
-                    "total_activities": len(chunk),
-                    "data_source": "Coros Running Watch",
-                    "purpose": "AI Training Coach Analysis (Chunk)"
-                },
-                "activities": chunk
-            }
-
-            # Calculate chunk statistics
-            chunk_stats = calculate_chunk_statistics(chunk)
-            chunk_log['metadata']['statistics'] = chunk_stats
-
-            # Determine chunk file name
-            chunk_filename = chunk_pattern.format(idx)
-            chunk_file_path = chunks_path / chunk_filename
-
-            # Save chunk file
-            with open(chunk_file_path, 'w', encoding='utf-8') as f:
-                json.dump(chunk_log, f, indent=2, ensure_ascii=False, default=str)
-
-            print(f"  ✓ Chunk {idx}/{len(chunks)}: {chunk_filename} ({len(chunk)} activities)")
-
-            # Track chunk info for index
-            chunks_info.append({
-                "file": chunk_filename,  # Use just the filename, not full path
-                "chunk_number": idx,
-                "activity_count": len(chunk),
-                "date_range": {
-                    "first_activity": chunk[0]['date'] if chunk else None,
-                    "last_activity": chunk[-1]['date'] if chunk else None
-                },
-                "statistics": chunk_stats
-            })
-
-        # Create index file in chunks directory
-        index_filename = 'training_log_index.json'
-        index_file = chunks_path / index_filename
-        create_index_file(chunks_info, str(index_file))
-
-        print(f"\n✓ Created {len(chunks)} chunk files")
-        print(f"\nOVERALL STATISTICS:")
-        print(f"  Total Activities: {len(json_files)}")
-        print(f"  Total Distance:   {overall_statistics['total_distance_km']} km")
-        print(f"  Total Time:       {overall_statistics['total_time_formatted']}")
-        print(f"  Total Calories:   {total_calories} kcal")
-        print(f"  Avg Distance:     {overall_statistics['average_distance_per_run']} km/run")
-        print(f"\nChunk files are ready to be provided to an AI training coach for analysis!")
-
+    elif chunk_size > 0 and len(json_files) > chunk_size:
+        # Whether to chunk depends on how many activities parse, not on how
+        # many files there are, so parse them all before deciding
+        collected = _collect(json_files, workers, pretty=pretty)
+        if len(collected[0]) > chunk_size:
+            _write_chunked_log(collected, chunk_size, chunk_pattern, chunks_dir, pretty)
+        else:
+            _write_single_log(json_files, output_path, workers, pretty, collected)
     else:
         # No chunking - create single file as before
-        training_log = {
-            "metadata": {
-                "athlete_name": "Training Log",
-                "created_at": datetime.now().isoformat(),
-                "total_activities": len(json_files),
-                "data_source": "Coros Running Watch",
-                "purpose": "AI Training Coach Analysis"
-            },
-            "activities": activities
-        }
-
-        training_log['metadata']['statistics'] = overall_statistics
-
-        # Save consolidated training log
-        output_path = Path(output_file)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(training_log, f, indent=2, ensure_ascii=False, default=str)
+        _write_single_log(json_files, output_path, workers, pretty)
 
-        print(f"\n✓ Training log created: {output_path}")
-        print(f"\nSTATISTICS:")
-        print(f"  Total Activities: {len(json_files)}")
-        print(f"  Total Distance:   {overall_statistics['total_distance_km']} km")
-        print(f"  Total Time:       {overall_statistics['total_time_formatted']}")
-        print(f"  Total Calories:   {total_calories} kcal")
-        print(f"  Avg Distance:     {overall_statistics['average_distance_per_run']} km/run")
-        print(f"\nThis file is ready to be provided to an AI training coach for analysis!")
 
-
-def main():
-    """Main entry point."""
+@lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command line parser (once; main() may be called repeatedly)."""
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -318,15 +737,29 @@ def main():
                       help='File pattern for chunks (default: training_log_part{}.json)')
     parser.add_argument('--chunks-dir', default='training_log_chunks',
                       help='Directory to store chunk files (default: training_log_chunks)')
+    parser.add_argument('--jsonl', action='store_true',
+                      help='Stream activities to a JSON Lines file with a .meta.json sidecar (no chunking)')
+    parser.add_argument('--workers', type=int, default=None,
+                      help='Number of processes for parsing files (default: auto, 1 = serial)')
+    parser.add_argument('--pretty', action='store_true',
+                      help='Indent the training log and chunk files (default: compact JSON)')
+
+    return parser
 
-    args = parser.parse_args()
+
+def main(argv: list = None):
+    """Main entry point."""
+    args = _build_parser().parse_args(argv)
 
     aggregate_training_data(
         args.input_dir,
         args.output,
         args.chunk_size,
         args.chunk_output_pattern,
-        args.chunks_dir
+        args.chunks_dir,
+        args.jsonl,
+        args.workers,
+        args.pretty
     )
 
 
@@ -316,6 +316,7 @@ class RunLogParser {
 
         return {
             total_distance_km: Math.round(totalDistance * 100) / 100,
+            total_time_seconds: Math.floor(totalTimeSeconds),
             total_time_formatted: this.formatTime(totalTimeSeconds),
             total_calories: totalCalories,
             average_distance_per_run: activities.length > 0
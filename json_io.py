@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+JSON reading helpers shared by the parser, viewer and training log scripts.
+
+orjson is used when it is installed; otherwise the stdlib json module.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Smallest possible JSON object: "{}"
+MIN_JSON_SIZE = 2
+
+
+def parse_json(raw):
+    """Decode JSON bytes, using orjson when it is installed."""
+    # Same check as load_json, so an empty file fails the same way whether
+    # it was read here or loaded from its path
+    if len(raw) < MIN_JSON_SIZE:
+        raise ValueError("file is empty")
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_json(path: Path):
+    """Load a JSON file, using orjson when it is installed."""
+    with open(path, 'rb') as f:
+        # Reject empty/truncated files before paying for a parse (and
+        # mmap cannot map an empty file anyway)
+        if os.fstat(f.fileno()).st_size < MIN_JSON_SIZE:
+            raise ValueError("file is empty")
+        if orjson is not None:
+            # orjson parses straight from the mapped pages: no heap copy of
+            # the file and no separate UTF-8 decode pass
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        return json.load(f)
+
+
+def list_json_files(data_dir: Path) -> list:
+    """
+    List the JSON files in a directory, sorted by name.
+
+    Uses os.scandir so the file type comes from the directory entry instead
+    of a stat() call per file.
+
+    Args:
+        data_dir: Directory to list
+
+    Returns:
+        Sorted list of JSON file paths
+    """
+    with os.scandir(data_dir) as entries:
+        names = [entry.name for entry in entries
+                 if entry.name.endswith('.json') and entry.is_file()]
+    names.sort()
+    return [data_dir / name for name in names]
@@ -6,20 +6,98 @@ and creates comprehensive JSON files for AI training analysis.
 """
 
 import os
+import io
+import sys
 import json
 import csv
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import re
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:  # lxml is optional; ElementTree has the same iterparse/find API
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from json_io import load_json
+
+
+# Activity folders are named by date (YYYYMMDD); any all-digit name is accepted
+_DATE_FOLDER_RE = re.compile(r'[0-9]+')
+
+_TCX_NS = '{http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2}'
 
 
 class CorosDataParser:
     """Parser for Coros running data in multiple formats."""
 
-    def __init__(self, data_dir: str = "./data"):
+    # Qualified (Clark notation) TCX tags and paths, resolved once instead of
+    # mapping 'tcx:' prefixes through a namespace dict on every find()
+    TAG_ACTIVITY = _TCX_NS + 'Activity'
+    TAG_ID = _TCX_NS + 'Id'
+    TAG_LAP = _TCX_NS + 'Lap'
+    TAG_TRACK = _TCX_NS + 'Track'
+    TAG_TRACKPOINT = _TCX_NS + 'Trackpoint'
+    TAG_TIME = _TCX_NS + 'Time'
+    TAG_POSITION = _TCX_NS + 'Position'
+    TAG_LATITUDE = _TCX_NS + 'LatitudeDegrees'
+    TAG_LONGITUDE = _TCX_NS + 'LongitudeDegrees'
+    TAG_ALTITUDE = _TCX_NS + 'AltitudeMeters'
+    TAG_DISTANCE = _TCX_NS + 'DistanceMeters'
+    TAG_HEART_RATE = _TCX_NS + 'HeartRateBpm'
+    TAG_VALUE = _TCX_NS + 'Value'
+    TAG_EXTENSIONS = _TCX_NS + 'Extensions'
+    TAG_TOTAL_TIME = _TCX_NS + 'TotalTimeSeconds'
+    TAG_MAX_SPEED = _TCX_NS + 'MaximumSpeed'
+    TAG_CALORIES = _TCX_NS + 'Calories'
+    TAG_AVG_HR_VALUE = _TCX_NS + 'AverageHeartRateBpm/' + _TCX_NS + 'Value'
+    TAG_MAX_HR_VALUE = _TCX_NS + 'MaximumHeartRateBpm/' + _TCX_NS + 'Value'
+    TAG_INTENSITY = _TCX_NS + 'Intensity'
+    TAG_TRIGGER_METHOD = _TCX_NS + 'TriggerMethod'
+
+    # Limit to avoid extremely large JSON files
+    MAX_TRACKPOINTS = 10000
+
+    # Column order of the columnar trackpoint layout
+    TRACKPOINT_COLUMNS = ('time', 'lat', 'lon', 'altitude_m', 'distance_m', 'heart_rate', 'speed_ms')
+
+    # lxml only: let libxml2 drop comments, processing instructions and blank
+    # text, never expand entities, and only emit events for the elements
+    # parse_tcx dispatches on (the leaf fields are read from their parents)
+    ITERPARSE_OPTIONS = {
+        'tag': (TAG_ACTIVITY, TAG_LAP, TAG_TRACK, TAG_TRACKPOINT),
+        'remove_blank_text': True,
+        'remove_comments': True,
+        'remove_pis': True,
+        'resolve_entities': False,
+    } if HAVE_LXML else {}
+
+    # CSV columns converted to numbers in split rows
+    FLOAT_KEYS = frozenset({'GetDistance', 'Elevation Gain', 'Elev Loss'})
+    INT_KEYS = frozenset({'Avg Run Cadence', 'Max Run Cadence', 'Avg Stride Length',
+                          'Avg HR', 'Max HR', 'Avg Temperature', 'Calories'})
+
+    def __init__(self, data_dir: str = "./data", columnar_trackpoints: bool = False):
+        """
+        Args:
+            data_dir: Directory containing YYYYMMDD activity folders
+            columnar_trackpoints: Store TCX trackpoints as
+                {"columns": TRACKPOINT_COLUMNS, "data": [one list per column]}
+                instead of one dict per point
+        """
         self.data_dir = Path(data_dir)
+        self.columnar_trackpoints = columnar_trackpoints
 
     def parse_csv_splits(self, csv_path: Path) -> Dict[str, Any]:
         """Parse CSV file containing split data."""
@@ -27,56 +105,67 @@ class CorosDataParser:
         summary = {}
 
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+            reader = csv.reader(f)
+            # Read the header once and zip each row against it, instead of
+            # DictReader building a dict and then a stripped copy per row
+            header = next(reader, [])
+            key_map = _split_key_map(tuple(header))
+            for values in reader:
+                if not values:
+                    continue
+
                 # Clean up whitespace from values
-                row = {k: v.strip() if isinstance(v, str) else v for k, v in row.items()}
+                row = dict(zip(header, map(str.strip, values)))
 
                 if row.get('Split') == 'Summary':
-                    summary = self._clean_split_row(row)
+                    summary = self._clean_split_row(row, key_map)
                 else:
-                    splits.append(self._clean_split_row(row))
+                    splits.append(self._clean_split_row(row, key_map))
 
         return {
             'splits': splits,
             'summary': summary
         }
 
-    def _clean_split_row(self, row: Dict) -> Dict[str, Any]:
-        """Clean and convert split row data to appropriate types."""
+    def _clean_split_row(self, row: Dict, key_map: Dict[str, str] = None) -> Dict[str, Any]:
+        """Clean and convert split row data to appropriate types.
+
+        Args:
+            row: Split row keyed by CSV column name
+            key_map: Column name to output key mapping, looked up once per
+                CSV by parse_csv_splits (derived from the row when omitted)
+        """
+        if key_map is None:
+            key_map = _split_key_map(tuple(row))
+
         cleaned = {}
         for key, value in row.items():
-            if not value or value == '':
+            if not value:
                 continue
 
             # Convert numeric values
-            if key in ['GetDistance', 'Elevation Gain', 'Elev Loss']:
-                try:
-                    cleaned[key.lower().replace(' ', '_')] = float(value)
-                except ValueError:
-                    cleaned[key.lower().replace(' ', '_')] = value
-            elif key in ['Avg Run Cadence', 'Max Run Cadence', 'Avg Stride Length',
-                        'Avg HR', 'Max HR', 'Avg Temperature', 'Calories']:
-                try:
-                    cleaned[key.lower().replace(' ', '_')] = int(value)
-                except ValueError:
-                    cleaned[key.lower().replace(' ', '_')] = value
+            if key in self.FLOAT_KEYS:
+                convert = float
+            elif key in self.INT_KEYS:
+                convert = int
             else:
-                cleaned[key.lower().replace(' ', '_')] = value
+                cleaned[key_map[key]] = value
+                continue
+
+            try:
+                cleaned[key_map[key]] = convert(value)
+            except ValueError:
+                cleaned[key_map[key]] = value
 
         return cleaned
 
     def parse_tcx(self, tcx_path: Path) -> Dict[str, Any]:
-        """Parse TCX file containing detailed GPS and sensor data."""
-        tree = ET.parse(tcx_path)
-        root = tree.getroot()
-
-        # Define namespace
-        ns = {
-            'tcx': 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2',
-            'ext': 'http://www.garmin.com/xmlschemas/ActivityExtension/v2'
-        }
+        """Parse TCX file containing detailed GPS and sensor data.
 
+        The file is streamed with iterparse: each Trackpoint and Lap is
+        read as soon as its end tag arrives and then cleared, so the whole
+        document tree is never held in memory.
+        """
         activity_data = {
             'activity_type': None,
             'activity_id': None,
@@ -84,90 +173,138 @@ class CorosDataParser:
             'trackpoints': []
         }
 
-        # Get activity info
-        activity = root.find('.//tcx:Activity', ns)
-        if activity is not None:
-            activity_data['activity_type'] = activity.get('Sport')
-            activity_id = activity.find('tcx:Id', ns)
-            if activity_id is not None:
-                activity_data['activity_id'] = activity_id.text
-
-        # Parse laps
-        for lap in root.findall('.//tcx:Lap', ns):
-            lap_data = {
-                'start_time': lap.get('StartTime'),
-                'total_time_seconds': self._get_float(lap, 'tcx:TotalTimeSeconds', ns),
-                'distance_meters': self._get_float(lap, 'tcx:DistanceMeters', ns),
-                'max_speed': self._get_float(lap, 'tcx:MaximumSpeed', ns),
-                'calories': self._get_int(lap, 'tcx:Calories', ns),
-                'avg_hr': self._get_int(lap, 'tcx:AverageHeartRateBpm/tcx:Value', ns),
-                'max_hr': self._get_int(lap, 'tcx:MaximumHeartRateBpm/tcx:Value', ns),
-                'intensity': self._get_text(lap, 'tcx:Intensity', ns),
-                'trigger_method': self._get_text(lap, 'tcx:TriggerMethod', ns)
-            }
+        activity_seen = False
+        trackpoints = activity_data['trackpoints']
+        add_trackpoint = trackpoints.append
+        max_trackpoints = self.MAX_TRACKPOINTS
+
+        for _, elem in ET.iterparse(str(tcx_path), events=('end',), **self.ITERPARSE_OPTIONS):
+            tag = elem.tag
+
+            if tag == self.TAG_TRACKPOINT:
+                # Parse trackpoints (detailed GPS and sensor data)
+                if len(trackpoints) < max_trackpoints:
+                    tp_data = self._parse_trackpoint(elem)
+                    # Only add trackpoint if it has useful data
+                    if len(tp_data) > 1:  # More than just time
+                        add_trackpoint(tp_data)
+                elem.clear()
+
+            elif tag == self.TAG_TRACK:
+                # Drop the cleared trackpoints still attached to the track
+                elem.clear()
+
+            elif tag == self.TAG_LAP:
+                # Parse laps
+                lap_data = {
+                    'start_time': elem.get('StartTime'),
+                    'total_time_seconds': self._get_float(elem, self.TAG_TOTAL_TIME),
+                    'distance_meters': self._get_float(elem, self.TAG_DISTANCE),
+                    'max_speed': self._get_float(elem, self.TAG_MAX_SPEED),
+                    'calories': self._get_int(elem, self.TAG_CALORIES),
+                    'avg_hr': self._get_int(elem, self.TAG_AVG_HR_VALUE),
+                    'max_hr': self._get_int(elem, self.TAG_MAX_HR_VALUE),
+                    'intensity': self._get_text(elem, self.TAG_INTENSITY),
+                    'trigger_method': self._get_text(elem, self.TAG_TRIGGER_METHOD)
+                }
 
-            # Clean None values
-            lap_data = {k: v for k, v in lap_data.items() if v is not None}
-            activity_data['laps'].append(lap_data)
+                # Clean None values
+                lap_data = {k: v for k, v in lap_data.items() if v is not None}
+                activity_data['laps'].append(lap_data)
+                elem.clear()
 
-        # Parse trackpoints (detailed GPS and sensor data)
-        trackpoint_count = 0
-        max_trackpoints = 10000  # Limit to avoid extremely large JSON files
+            elif tag == self.TAG_ACTIVITY:
+                # Get activity info from the first activity
+                if not activity_seen:
+                    activity_seen = True
+                    activity_data['activity_type'] = elem.get('Sport')
+                    activity_id = elem.find(self.TAG_ID)
+                    if activity_id is not None:
+                        activity_data['activity_id'] = activity_id.text
+                elem.clear()
 
-        for trackpoint in root.findall('.//tcx:Trackpoint', ns):
-            if trackpoint_count >= max_trackpoints:
-                break
+        if self.columnar_trackpoints:
+            activity_data['trackpoints'] = self._trackpoint_columns(trackpoints)
 
-            tp_data = {
-                'time': self._get_text(trackpoint, 'tcx:Time', ns),
-            }
+        return activity_data
 
-            # Position (GPS)
-            position = trackpoint.find('tcx:Position', ns)
-            if position is not None:
-                lat = self._get_float(position, 'tcx:LatitudeDegrees', ns)
-                lon = self._get_float(position, 'tcx:LongitudeDegrees', ns)
+    def _parse_trackpoint(self, trackpoint) -> Dict[str, Any]:
+        """Extract time, position and sensor values from a Trackpoint element.
+
+        The children are visited once and dispatched on their tag, rather
+        than searched with one find() per field (most of which miss, e.g.
+        Extensions on exports without speed data).
+        """
+        time = position = altitude = distance = hr = speed = None
+
+        for child in trackpoint:
+            tag = child.tag
+            if tag == self.TAG_TIME:
+                time = child.text
+            elif tag == self.TAG_POSITION:
+                # Position (GPS)
+                lat = self._get_float(child, self.TAG_LATITUDE)
+                lon = self._get_float(child, self.TAG_LONGITUDE)
                 if lat is not None and lon is not None:
-                    tp_data['position'] = {'lat': lat, 'lon': lon}
-
-            # Other metrics
-            altitude = self._get_float(trackpoint, 'tcx:AltitudeMeters', ns)
-            distance = self._get_float(trackpoint, 'tcx:DistanceMeters', ns)
-            hr = self._get_int(trackpoint, 'tcx:HeartRateBpm/tcx:Value', ns)
-
-            # Extensions (speed, cadence, etc.)
-            extensions = trackpoint.find('tcx:Extensions', ns)
-            if extensions is not None:
-                # Speed might be a direct child
-                speed_elem = extensions.find('Speed')
+                    position = {'lat': lat, 'lon': lon}
+            elif tag == self.TAG_ALTITUDE:
+                altitude = self._to_float(child.text)
+            elif tag == self.TAG_DISTANCE:
+                distance = self._to_float(child.text)
+            elif tag == self.TAG_HEART_RATE:
+                hr = self._get_int(child, self.TAG_VALUE)
+            elif tag == self.TAG_EXTENSIONS:
+                # Extensions (speed, cadence, etc.); speed might be a direct child
+                speed_elem = child.find('Speed')
                 if speed_elem is not None:
-                    try:
-                        tp_data['speed_ms'] = float(speed_elem.text)
-                    except (ValueError, TypeError):
-                        pass
-
-            if altitude is not None:
-                tp_data['altitude_m'] = altitude
-            if distance is not None:
-                tp_data['distance_m'] = distance
-            if hr is not None:
-                tp_data['heart_rate'] = hr
-
-            # Only add trackpoint if it has useful data
-            if len(tp_data) > 1:  # More than just time
-                activity_data['trackpoints'].append(tp_data)
-                trackpoint_count += 1
-
-        return activity_data
+                    speed = self._to_float(speed_elem.text)
+
+        tp_data = {'time': time}
+        if position is not None:
+            tp_data['position'] = position
+        if speed is not None:
+            tp_data['speed_ms'] = speed
+        if altitude is not None:
+            tp_data['altitude_m'] = altitude
+        if distance is not None:
+            tp_data['distance_m'] = distance
+        if hr is not None:
+            tp_data['heart_rate'] = hr
+
+        return tp_data
+
+    def _trackpoint_columns(self, trackpoints: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert trackpoint dicts to the columnar layout (None where a point has no value)."""
+        positions = [tp.get('position') or {} for tp in trackpoints]
+        return {
+            'columns': list(self.TRACKPOINT_COLUMNS),
+            'data': [
+                [tp['time'] for tp in trackpoints],
+                [position.get('lat') for position in positions],
+                [position.get('lon') for position in positions],
+                [tp.get('altitude_m') for tp in trackpoints],
+                [tp.get('distance_m') for tp in trackpoints],
+                [tp.get('heart_rate') for tp in trackpoints],
+                [tp.get('speed_ms') for tp in trackpoints],
+            ]
+        }
 
-    def _get_text(self, element, path: str, ns: dict) -> Optional[str]:
+    def _get_text(self, element, path: str, ns: dict = None) -> Optional[str]:
         """Safely get text from XML element."""
         found = element.find(path, ns)
         return found.text if found is not None else None
 
-    def _get_float(self, element, path: str, ns: dict) -> Optional[float]:
+    def _get_float(self, element, path: str, ns: dict = None) -> Optional[float]:
         """Safely get float from XML element."""
-        text = self._get_text(element, path, ns)
+        return self._to_float(self._get_text(element, path, ns))
+
+    def _get_int(self, element, path: str, ns: dict = None) -> Optional[int]:
+        """Safely get int from XML element."""
+        return self._to_int(self._get_text(element, path, ns))
+
+    @staticmethod
+    def _to_float(text: Optional[str]) -> Optional[float]:
+        """Convert element text to float, or None if missing or invalid."""
         if text is not None:
             try:
                 return float(text)
@@ -175,13 +312,18 @@ class CorosDataParser:
                 return None
         return None
 
-    def _get_int(self, element, path: str, ns: dict) -> Optional[int]:
-        """Safely get int from XML element."""
-        text = self._get_text(element, path, ns)
+    @staticmethod
+    def _to_int(text: Optional[str]) -> Optional[int]:
+        """Convert element text to int, or None if missing or invalid."""
         if text is not None:
             try:
-                return int(float(text))
+                # Integer fields (heart rate, calories) are usually plain digits
+                return int(text)
             except ValueError:
+                pass
+            try:
+                return int(float(text))
+            except (ValueError, OverflowError):
                 return None
         return None
 
@@ -190,37 +332,31 @@ class CorosDataParser:
         try:
             from fitparse import FitFile
 
-            fitfile = FitFile(str(fit_path))
             fit_data = {
                 'records': [],
                 'laps': [],
                 'session': {}
             }
 
-            for record in fitfile.get_messages():
-                msg_type = record.name
-
-                if msg_type == 'record':
-                    # GPS and sensor records
-                    record_data = {}
-                    for field in record:
-                        if field.value is not None:
-                            record_data[field.name] = field.value
-                    if record_data:
-                        fit_data['records'].append(record_data)
-
-                elif msg_type == 'lap':
-                    lap_data = {}
-                    for field in record:
-                        if field.value is not None:
-                            lap_data[field.name] = field.value
-                    if lap_data:
-                        fit_data['laps'].append(lap_data)
-
-                elif msg_type == 'session':
-                    for field in record:
-                        if field.value is not None:
-                            fit_data['session'][field.name] = field.value
+            with FitFile(str(fit_path)) as fitfile:
+                for record in _iter_fit_messages(fitfile, ('record', 'lap', 'session')):
+                    msg_type = record.name
+
+                    # Iterating the message (rather than record.fields) keeps
+                    # fitparse's field order, so duplicate names resolve the same way
+                    values = {field.name: field.value for field in record if field.value is not None}
+
+                    if msg_type == 'record':
+                        # GPS and sensor records
+                        if values:
+                            fit_data['records'].append(values)
+
+                    elif msg_type == 'lap':
+                        if values:
+                            fit_data['laps'].append(values)
+
+                    elif msg_type == 'session':
+                        fit_data['session'].update(values)
 
             return fit_data
 
@@ -247,20 +383,23 @@ class CorosDataParser:
         metadata_file = date_folder / 'metadata.json'
         if metadata_file.exists():
             try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    activity_data['metadata'] = json.load(f)
+                activity_data['metadata'] = load_json(metadata_file)
                 if verbose:
                     run_type = activity_data['metadata'].get('run_type', 'unknown')
                     print(f"  Run type: {run_type}")
             except Exception as e:
                 activity_data['metadata'] = {'error': f'Failed to read metadata: {str(e)}'}
 
-        # Find all files in the folder
-        files = list(date_folder.glob('*'))
+        # Find all files in the folder, bucketed by type in a single pass
+        files_by_suffix = {'.csv': [], '.tcx': [], '.fit': []}
+        for f in date_folder.iterdir():
+            bucket = files_by_suffix.get(f.suffix)
+            if bucket is not None:
+                bucket.append(f)
 
-        csv_files = [f for f in files if f.suffix == '.csv']
-        tcx_files = [f for f in files if f.suffix == '.tcx']
-        fit_files = [f for f in files if f.suffix == '.fit']
+        csv_files = files_by_suffix['.csv']
+        tcx_files = files_by_suffix['.tcx']
+        fit_files = files_by_suffix['.fit']
 
         # Report files found
         if verbose:
@@ -321,48 +460,193 @@ class CorosDataParser:
 
         return activity_data
 
-    def process_all_activities(self, output_dir: str = "./parsed_data") -> None:
-        """Process all activities in the data directory."""
+    def process_all_activities(self, output_dir: str = "./parsed_data", workers: int = None) -> None:
+        """Process all activities in the data directory.
+
+        Args:
+            output_dir: Directory to save parsed JSON files
+            workers: Number of processes used to parse activities (default:
+                1, parse in this process)
+        """
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
 
-        # Find all date folders
-        date_folders = [d for d in self.data_dir.iterdir() if d.is_dir() and d.name.isdigit()]
-        date_folders.sort()
+        # Find all date folders; DirEntry.is_dir() answers from the directory
+        # listing without a stat() per entry
+        with os.scandir(self.data_dir) as entries:
+            date_folders = sorted(
+                Path(entry.path) for entry in entries
+                if _DATE_FOLDER_RE.fullmatch(entry.name) and entry.is_dir()
+            )
 
         print(f"Found {len(date_folders)} activities to process")
 
-        for date_folder in date_folders:
-            print(f"\nProcessing {date_folder.name}...")
+        if workers is not None and workers > 1:
+            self._process_parallel(date_folders, output_path, workers)
+            return
 
-            try:
-                activity_data = self.parse_activity(date_folder)
+        # Each activity is saved on a writer thread while the next one is
+        # parsed; at most one save is in flight, so memory stays bounded.
+        # The next activity's messages are held back until the previous
+        # save has been reported, so every line lands under its own heading
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
 
-                # Save to JSON
-                output_file = output_path / f"{date_folder.name}.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(activity_data, f, indent=2, ensure_ascii=False, default=str)
+            for date_folder in date_folders:
+                output, error_output = io.StringIO(), io.StringIO()
+                with redirect_stdout(output), redirect_stderr(error_output):
+                    activity_data = self._parse_reported(date_folder)
 
-                print(f"  ✓ Saved to {output_file}")
+                _finish_write(pending)
+                pending = None
+                sys.stdout.write(output.getvalue())
+                sys.stderr.write(error_output.getvalue())
 
-                # Print summary
-                if 'csv' in activity_data['sources'] and 'data' in activity_data['sources']['csv']:
-                    csv_data = activity_data['sources']['csv']['data']
-                    if 'summary' in csv_data:
-                        summary = csv_data['summary']
-                        print(f"  Distance: {summary.get('getdistance', 'N/A')} km")
-                        print(f"  Time: {summary.get('time', 'N/A')}")
-                        print(f"  Avg Pace: {summary.get('avg_pace', 'N/A')}")
-                        print(f"  Avg HR: {summary.get('avg_hr', 'N/A')} bpm")
+                if activity_data is not None:
+                    output_file = output_path / f"{date_folder.name}.json"
+                    pending = (writer.submit(_save_activity, activity_data, output_file),
+                               output_file, _csv_summary(activity_data))
 
-            except Exception as e:
-                print(f"  ✗ Error: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            _finish_write(pending)
 
+    def _parse_reported(self, date_folder: Path) -> Optional[Dict[str, Any]]:
+        """Parse one activity folder under its heading (None if parsing failed)."""
+        print(f"\nProcessing {date_folder.name}...")
 
-def main():
-    """Main entry point."""
+        try:
+            return self.parse_activity(date_folder)
+        except Exception as e:
+            print(f"  ✗ Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def _process_one(self, date_folder: Path, output_path: Path) -> None:
+        """Parse and save one activity folder, reporting progress and errors."""
+        activity_data = self._parse_reported(date_folder)
+        if activity_data is None:
+            return
+
+        # Save to JSON
+        output_file = output_path / f"{date_folder.name}.json"
+        try:
+            _save_activity(activity_data, output_file)
+        except Exception as e:
+            print(f"  ✗ Error saving {output_file}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return
+
+        print(f"  ✓ Saved to {output_file}")
+        _print_summary(_csv_summary(activity_data))
+
+    def _process_parallel(self, date_folders: List[Path], output_path: Path, workers: int) -> None:
+        """Process activities in worker processes, printing their reports in date order."""
+        process = partial(_process_captured, self, output_path=output_path)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields results in submission order, so the output is the
+            # same as the serial loop's
+            for output, error_output in pool.map(process, date_folders):
+                sys.stdout.write(output)
+                sys.stderr.write(error_output)
+
+
+@lru_cache(maxsize=32)
+def _split_key_map(header: tuple) -> Dict[str, str]:
+    """
+    Map CSV column names to split keys ('Avg HR' -> 'avg_hr').
+
+    Coros exports share one header layout, so when many activities are
+    parsed the mapping (and its key strings) is built once and reused.
+    The returned dict is shared and must not be modified.
+    """
+    return {key: key.lower().replace(' ', '_') for key in header}
+
+
+def _iter_fit_messages(fitfile, names) -> Iterator:
+    """
+    Yield the named data messages of a FitFile without retaining them.
+
+    fitparse appends every parsed message to FitFile._messages, so a long
+    activity otherwise stays in memory as message objects alongside the
+    dicts built from it. The cache is only replayed by later get_messages()
+    calls (decoding state lives in _local_mesgs), so it is dropped as
+    messages are consumed.
+    """
+    cache = getattr(fitfile, '_messages', None)
+    for message in fitfile.get_messages(names):
+        if cache is not None:
+            cache.clear()
+        yield message
+
+
+def _save_activity(activity_data: Dict[str, Any], output_file: Path) -> None:
+    """Write one parsed activity as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        # Datetimes from FIT files go through default=str, as with json.dump
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(activity_data, default=str, option=option))
+        return
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(activity_data, f, indent=2, ensure_ascii=False, default=str)
+
+
+def _finish_write(pending: Optional[tuple]) -> None:
+    """Wait for a queued (future, output_file, csv_summary) save and report it."""
+    if pending is None:
+        return
+
+    future, output_file, summary = pending
+    try:
+        future.result()
+    except Exception as e:
+        print(f"  ✗ Error saving {output_file}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return
+
+    print(f"  ✓ Saved to {output_file}")
+    _print_summary(summary)
+
+
+def _csv_summary(activity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the CSV summary of a parsed activity, if it has one."""
+    csv_source = activity_data['sources'].get('csv')
+    if csv_source and 'data' in csv_source:
+        return csv_source['data'].get('summary')
+    return None
+
+
+def _print_summary(summary: Optional[Dict[str, Any]]) -> None:
+    """Print distance, time, pace and heart rate from a CSV summary."""
+    if summary is not None:
+        print(f"  Distance: {summary.get('getdistance', 'N/A')} km")
+        print(f"  Time: {summary.get('time', 'N/A')}")
+        print(f"  Avg Pace: {summary.get('avg_pace', 'N/A')}")
+        print(f"  Avg HR: {summary.get('avg_hr', 'N/A')} bpm")
+
+
+def _process_captured(parser: CorosDataParser, date_folder: Path, output_path: Path) -> tuple:
+    """
+    Process one activity folder in a worker process, capturing its report.
+
+    Runs the same steps as the serial loop, so the progress lines, the
+    separate parse and save errors and the worker's own tracebacks all get
+    back to the parent to be printed there.
+
+    Returns:
+        Tuple of (stdout_text, stderr_text)
+    """
+    output, error_output = io.StringIO(), io.StringIO()
+    with redirect_stdout(output), redirect_stderr(error_output):
+        parser._process_one(date_folder, output_path)
+    return output.getvalue(), error_output.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command line parser (once; main() may be called repeatedly)."""
     import argparse
 
     parser = argparse.ArgumentParser(description='Parse Coros running data to JSON')
@@ -372,10 +656,19 @@ def main():
                       help='Directory to save parsed JSON files')
     parser.add_argument('--single-date',
                       help='Process only a specific date (YYYYMMDD format)')
+    parser.add_argument('--columnar-trackpoints', action='store_true',
+                      help='Store TCX trackpoints as one list per field instead of one object per point')
+    parser.add_argument('--workers', type=int, default=None,
+                      help='Number of processes used to parse activities (default: 1)')
 
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: list = None):
+    """Main entry point."""
+    args = _build_parser().parse_args(argv)
 
-    parser_obj = CorosDataParser(args.data_dir)
+    parser_obj = CorosDataParser(args.data_dir, args.columnar_trackpoints)
 
     if args.single_date:
         date_folder = Path(args.data_dir) / args.single_date
@@ -390,12 +683,11 @@ def main():
         output_path.mkdir(exist_ok=True)
         output_file = output_path / f"{args.single_date}.json"
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(activity_data, f, indent=2, ensure_ascii=False, default=str)
+        _save_activity(activity_data, output_file)
 
         print(f"✓ Saved to {output_file}")
     else:
-        parser_obj.process_all_activities(args.output_dir)
+        parser_obj.process_all_activities(args.output_dir, args.workers)
 
     print("\n✓ Processing complete!")
 
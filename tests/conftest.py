@@ -4,10 +4,38 @@ Pytest configuration and shared fixtures for runlog-ai tests.
 
 import pytest
 import json
+import os
+import shutil
 import tempfile
 from pathlib import Path
 
 
+# Session fixture files are shared by every test, so they are made read-only:
+# an accidental in-place write then fails instead of corrupting later tests
+READ_ONLY = 0o444
+
+
+def _write_read_only(path, data: bytes):
+    """Write a session fixture file and make it read-only."""
+    path.write_bytes(data)
+    path.chmod(READ_ONLY)
+    return path
+
+
+def _link_or_copy(source, target):
+    """Hard-link a read-only fixture file into place (copy across filesystems)."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+@pytest.fixture(scope="session")
+def link_or_copy():
+    """The _link_or_copy helper, for tests that place session fixture files."""
+    return _link_or_copy
+
+
 @pytest.fixture
 def temp_data_dir(tmp_path):
     """Create a temporary data directory for testing."""
@@ -24,7 +52,13 @@ def temp_parsed_dir(tmp_path):
     return parsed_dir
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def canonical_dir(tmp_path_factory):
+    """Session-wide directory for fixture files that are written once and reused."""
+    return tmp_path_factory.mktemp("canon")
+
+
+@pytest.fixture(scope="session")
 def sample_csv_content():
     """Sample CSV content for testing."""
     return """Split,GetDistance,Time,Moving Time,Avg Pace,Best Pace,Avg Run Cadence,Max Run Cadence,Avg Stride Length,Avg HR,Max HR,Elevation Gain,Elev Loss,Avg Temperature,Calories
@@ -33,7 +67,7 @@ def sample_csv_content():
 Summary,2.00,00:14:15,00:14:15,00:07:07,00:06:45,171,182,95,136,148,9,5,12,172"""
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_tcx_content():
     """Sample TCX content for testing."""
     return """<?xml version="1.0" encoding="UTF-8"?>
@@ -92,6 +126,25 @@ def sample_tcx_content():
 </TrainingCenterDatabase>"""
 
 
+@pytest.fixture(scope="session")
+def materialized_csv(canonical_dir, sample_csv_content):
+    """sample_csv_content written once per session (read-only)."""
+    return _write_read_only(canonical_dir / "activity.csv", sample_csv_content.encode('utf-8'))
+
+
+@pytest.fixture(scope="session")
+def materialized_tcx(canonical_dir, sample_tcx_content):
+    """sample_tcx_content written once per session (read-only)."""
+    return _write_read_only(canonical_dir / "activity.tcx", sample_tcx_content.encode('utf-8'))
+
+
+@pytest.fixture(scope="session")
+def shared_parser(tmp_path_factory):
+    """One CorosDataParser for tests that only call its parse and helper methods."""
+    from parse_coros_data import CorosDataParser
+    return CorosDataParser(str(tmp_path_factory.mktemp("shared")))
+
+
 @pytest.fixture
 def sample_metadata():
     """Sample metadata for testing."""
@@ -105,19 +158,21 @@ def sample_metadata():
 
 
 @pytest.fixture
-def sample_activity_folder(temp_data_dir, sample_csv_content, sample_tcx_content, sample_metadata):
-    """Create a complete sample activity folder with all files."""
+def sample_activity_folder(temp_data_dir, materialized_csv, materialized_tcx, sample_metadata):
+    """Create a complete sample activity folder with all files.
+
+    The CSV and TCX files are copies of the session files, so tests may
+    modify them freely.
+    """
     activity_date = "20251202"
     activity_dir = temp_data_dir / activity_date
     activity_dir.mkdir()
 
     # Create CSV file
-    csv_file = activity_dir / "activity.csv"
-    csv_file.write_text(sample_csv_content)
+    shutil.copyfile(materialized_csv, activity_dir / "activity.csv")
 
     # Create TCX file
-    tcx_file = activity_dir / "activity.tcx"
-    tcx_file.write_text(sample_tcx_content)
+    shutil.copyfile(materialized_tcx, activity_dir / "activity.tcx")
 
     # Create metadata file
     metadata_file = activity_dir / "metadata.json"
@@ -183,3 +238,172 @@ def sample_parsed_activity():
             }
         }
     }
+
+
+@pytest.fixture(scope="session")
+def multi_activity_payloads():
+    """Two outdoor runs with CSV summaries (read-only, shared by the session)."""
+    return (
+        {
+            "date": "20251201",
+            "metadata": {"run_type": "outdoor"},
+            "sources": {
+                "csv": {
+                    "data": {
+                        "summary": {
+                            "getdistance": 5.0,
+                            "time": "00:35:00",
+                            "avg_hr": 140,
+                            "calories": 300
+                        },
+                        "splits": [{"split": "1", "getdistance": 1.0}]
+                    }
+                }
+            }
+        },
+        {
+            "date": "20251202",
+            "metadata": {"run_type": "outdoor"},
+            "sources": {
+                "csv": {
+                    "data": {
+                        "summary": {
+                            "getdistance": 3.0,
+                            "time": "00:21:00",
+                            "avg_hr": 135,
+                            "calories": 180
+                        },
+                        "splits": []
+                    }
+                }
+            }
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def time_parsing_payloads():
+    """Two runs whose summary times add up to 01:56:00 (read-only, shared by the session)."""
+    return (
+        {
+            "date": "20251201",
+            "metadata": {},
+            "sources": {
+                "csv": {
+                    "data": {
+                        "summary": {
+                            "getdistance": 5.0,
+                            "time": "01:30:45",  # 1 hour 30 min 45 sec
+                            "calories": 300
+                        }
+                    }
+                }
+            }
+        },
+        {
+            "date": "20251202",
+            "metadata": {},
+            "sources": {
+                "csv": {
+                    "data": {
+                        "summary": {
+                            "getdistance": 3.0,
+                            "time": "00:25:15",  # 25 min 15 sec
+                            "calories": 180
+                        }
+                    }
+                }
+            }
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def date_range_payloads():
+    """Three activities spanning 20251120-20251201 (read-only, shared by the session)."""
+    return (
+        {"date": "20251120", "metadata": {}, "sources": {}},
+        {"date": "20251125", "metadata": {}, "sources": {}},
+        {"date": "20251201", "metadata": {}, "sources": {}}
+    )
+
+
+@pytest.fixture(scope="session")
+def splits_activity_payload():
+    """One run whose CSV data has three splits (read-only, shared by the session)."""
+    return {
+        "date": "20251202",
+        "metadata": {},
+        "sources": {
+            "csv": {
+                "data": {
+                    "summary": {"getdistance": 3.0},
+                    "splits": [
+                        {"split": "1", "getdistance": 1.0, "time": "00:07:00"},
+                        {"split": "2", "getdistance": 1.0, "time": "00:07:10"},
+                        {"split": "3", "getdistance": 1.0, "time": "00:07:20"}
+                    ]
+                }
+            }
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def tcx_metadata_activity_payload():
+    """One run with a CSV summary and TCX metadata (read-only, shared by the session)."""
+    return {
+        "date": "20251202",
+        "metadata": {},
+        "sources": {
+            "csv": {
+                "data": {
+                    "summary": {"getdistance": 2.0, "time": "00:14:00"}
+                }
+            },
+            "tcx": {
+                "data": {
+                    "activity_type": "Running",
+                    "activity_id": "2025-12-02T12:00:00Z",
+                    "trackpoints": [{"time": "2025-12-02T12:00:00Z"}],
+                    "laps": [{"start_time": "2025-12-02T12:00:00Z"}]
+                }
+            }
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def missing_csv_activity_payload():
+    """One run with TCX data but no CSV source (read-only, shared by the session)."""
+    return {
+        "date": "20251202",
+        "metadata": {"run_type": "outdoor"},
+        "sources": {
+            "tcx": {
+                "data": {
+                    "activity_type": "Running"
+                }
+            }
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def invalid_numeric_activity_payload():
+    """One run whose summary values are not numbers (read-only, shared by the session)."""
+    return {
+        "date": "20251202",
+        "metadata": {},
+        "sources": {
+            "csv": {
+                "data": {
+                    "summary": {
+                        "getdistance": "invalid",
+                        "time": "invalid:time",
+                        "calories": "N/A"
+                    }
+                }
+            }
+        }
+    }
@@ -4,99 +4,144 @@ Tests for create_training_log.py module.
 
 import pytest
 import json
+import os
+import tempfile
 from pathlib import Path
+import create_training_log
+import json_io
 from create_training_log import (
     aggregate_training_data,
     create_chunks,
     calculate_chunk_statistics,
-    create_index_file
+    create_index_file,
+    iter_activities,
+    main,
+    _build_parser,
+    _activity_separator,
+    _dump_json,
+    _encode_activity,
+    _write_log
 )
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class TestAggregateTrainingData:
-    """Tests for aggregate_training_data function."""
 
-    def test_aggregate_with_single_activity(self, temp_parsed_dir, sample_parsed_activity):
-        """Test aggregating a single activity."""
-        # Create a parsed activity file
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(sample_parsed_activity, f)
+def _dump(path, obj):
+    """Write obj to path as JSON (orjson when available)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj))
+    else:
+        path.write_text(json.dumps(obj), encoding='utf-8')
 
-        output_file = temp_parsed_dir / "training_log.json"
-        # Use chunk_size=0 to disable chunking for single file test
-        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        # Verify output file exists
-        assert output_file.exists()
+def _load(path):
+    """Read a JSON document from path (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding='utf-8'))
 
-        # Load and verify content
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
 
-        assert "metadata" in training_log
-        assert "activities" in training_log
-        assert training_log["metadata"]["total_activities"] == 1
-        assert len(training_log["activities"]) == 1
+def _check_single_activity(training_log):
+    """Check aggregating a single activity."""
+    assert "metadata" in training_log
+    assert "activities" in training_log
+    assert training_log["metadata"]["total_activities"] == 1
+    assert len(training_log["activities"]) == 1
 
-        # Verify activity data
-        activity = training_log["activities"][0]
-        assert activity["date"] == "20251202"
-        assert activity["metadata"]["run_type"] == "outdoor"
-        assert activity["summary"]["getdistance"] == 2.0
-        assert activity["summary"]["avg_hr"] == 136
+    # Verify activity data
+    activity = training_log["activities"][0]
+    assert activity["date"] == "20251202"
+    assert activity["metadata"]["run_type"] == "outdoor"
+    assert activity["summary"]["getdistance"] == 2.0
+    assert activity["summary"]["avg_hr"] == 136
 
-    def test_aggregate_with_multiple_activities(self, temp_parsed_dir):
-        """Test aggregating multiple activities."""
-        # Create multiple parsed activity files
-        activities = [
-            {
-                "date": "20251201",
-                "metadata": {"run_type": "outdoor"},
-                "sources": {
-                    "csv": {
-                        "data": {
-                            "summary": {
-                                "getdistance": 5.0,
-                                "time": "00:35:00",
-                                "avg_hr": 140,
-                                "calories": 300
-                            },
-                            "splits": [{"split": "1", "getdistance": 1.0}]
-                        }
-                    }
-                }
-            },
-            {
-                "date": "20251202",
-                "metadata": {"run_type": "outdoor"},
-                "sources": {
-                    "csv": {
-                        "data": {
-                            "summary": {
-                                "getdistance": 3.0,
-                                "time": "00:21:00",
-                                "avg_hr": 135,
-                                "calories": 180
-                            },
-                            "splits": []
-                        }
-                    }
-                }
-            }
-        ]
 
-        for activity in activities:
+def _check_splits_included(training_log):
+    """Check that splits are included in activity summary."""
+    activity_data = training_log["activities"][0]
+    assert "splits" in activity_data
+    assert len(activity_data["splits"]) == 3
+    assert activity_data["splits"][0]["split"] == "1"
+
+
+def _check_tcx_metadata(training_log):
+    """Check aggregating with TCX metadata."""
+    # Verify TCX metadata is included
+    activity_data = training_log["activities"][0]
+    assert "tcx_metadata" in activity_data
+    assert activity_data["tcx_metadata"]["activity_type"] == "Running"
+    assert activity_data["tcx_metadata"]["total_trackpoints"] == 1
+    assert activity_data["tcx_metadata"]["total_laps"] == 1
+
+
+def _check_missing_csv_data(training_log):
+    """Check aggregating activity without CSV data."""
+    # Should still process without errors
+    assert len(training_log["activities"]) == 1
+    assert "summary" not in training_log["activities"][0]
+
+
+def _check_invalid_numeric_values(training_log):
+    """Check aggregating with invalid numeric values in summary."""
+    # Should handle gracefully with zeros
+    stats = training_log["metadata"]["statistics"]
+    assert stats["total_distance_km"] == 0
+    assert stats["total_calories"] == 0
+
+
+class TestAggregateTrainingData:
+    """Tests for aggregate_training_data function."""
+
+    @pytest.fixture
+    def prepared_dir(self, request, temp_parsed_dir, canonical_dir, link_or_copy):
+        """Link the activity payload named by the parameter into temp_parsed_dir.
+
+        Each payload is serialized once per session into canonical_dir and
+        hard-linked (or copied, where links are not allowed) into every test
+        directory that uses it.
+        """
+        payload = request.getfixturevalue(request.param)
+        canonical = canonical_dir / f"{request.param}.json"
+        if not canonical.exists():
+            _dump(canonical, payload)
+            # Shared through hard links: fail loudly on in-place writes
+            canonical.chmod(0o444)
+        link_or_copy(canonical, temp_parsed_dir / f"{payload['date']}.json")
+        return temp_parsed_dir
+
+    @pytest.mark.parametrize(
+        "prepared_dir, check",
+        [
+            pytest.param("sample_parsed_activity", _check_single_activity, id="single_activity"),
+            pytest.param("splits_activity_payload", _check_splits_included, id="splits_included"),
+            pytest.param("tcx_metadata_activity_payload", _check_tcx_metadata, id="tcx_metadata"),
+            pytest.param("missing_csv_activity_payload", _check_missing_csv_data, id="missing_csv_data"),
+            pytest.param("invalid_numeric_activity_payload", _check_invalid_numeric_values, id="invalid_numeric_values")
+        ],
+        indirect=["prepared_dir"]
+    )
+    def test_aggregate_single_activity_cases(self, prepared_dir, check):
+        """Test aggregating one activity file, checked case by case."""
+        output_file = prepared_dir / "training_log.json"
+        # Use chunk_size=0 to disable chunking for single file tests
+        aggregate_training_data(str(prepared_dir), str(output_file), chunk_size=0)
+
+        check(_load(output_file))
+
+    def test_aggregate_with_multiple_activities(self, temp_parsed_dir, multi_activity_payloads):
+        """Test aggregating multiple activities."""
+        for activity in multi_activity_payloads:
             activity_file = temp_parsed_dir / f"{activity['date']}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         output_file = temp_parsed_dir / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
         # Load and verify
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
         assert training_log["metadata"]["total_activities"] == 2
         assert len(training_log["activities"]) == 2
@@ -107,318 +152,279 @@ class TestAggregateTrainingData:
         assert stats["total_calories"] == 480
         assert stats["average_distance_per_run"] == 4.0
 
-    def test_aggregate_with_tcx_metadata(self, temp_parsed_dir):
-        """Test aggregating with TCX metadata."""
+    def test_aggregate_counts_columnar_trackpoints(self, temp_parsed_dir):
+        """Test total_trackpoints is counted from the columnar trackpoint layout."""
         activity = {
             "date": "20251202",
-            "metadata": {},
             "sources": {
-                "csv": {
-                    "data": {
-                        "summary": {"getdistance": 2.0, "time": "00:14:00"}
-                    }
-                },
                 "tcx": {
                     "data": {
                         "activity_type": "Running",
-                        "activity_id": "2025-12-02T12:00:00Z",
-                        "trackpoints": [{"time": "2025-12-02T12:00:00Z"}],
-                        "laps": [{"start_time": "2025-12-02T12:00:00Z"}]
+                        "trackpoints": {
+                            "columns": ["time", "lat", "lon"],
+                            "data": [["t0", "t1", "t2"], [1.0, 1.1, 1.2], [2.0, 2.1, 2.2]]
+                        },
+                        "laps": []
                     }
                 }
             }
         }
 
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(activity, f)
-
-        output_file = temp_parsed_dir / "training_log.json"
-        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
+        _dump(temp_parsed_dir / "20251202.json", activity)
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
-
-        # Verify TCX metadata is included
-        activity_data = training_log["activities"][0]
-        assert "tcx_metadata" in activity_data
-        assert activity_data["tcx_metadata"]["activity_type"] == "Running"
-        assert activity_data["tcx_metadata"]["total_trackpoints"] == 1
-        assert activity_data["tcx_metadata"]["total_laps"] == 1
-
-    def test_aggregate_with_missing_csv_data(self, temp_parsed_dir):
-        """Test aggregating activity without CSV data."""
-        activity = {
-            "date": "20251202",
-            "metadata": {"run_type": "outdoor"},
-            "sources": {
-                "tcx": {
-                    "data": {
-                        "activity_type": "Running"
-                    }
-                }
-            }
-        }
-
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(activity, f)
-
-        output_file = temp_parsed_dir / "training_log.json"
-        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
-
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
-
-        # Should still process without errors
-        assert len(training_log["activities"]) == 1
-        assert "summary" not in training_log["activities"][0]
-
-    def test_aggregate_with_invalid_numeric_values(self, temp_parsed_dir):
-        """Test aggregating with invalid numeric values in summary."""
-        activity = {
-            "date": "20251202",
-            "metadata": {},
-            "sources": {
-                "csv": {
-                    "data": {
-                        "summary": {
-                            "getdistance": "invalid",
-                            "time": "invalid:time",
-                            "calories": "N/A"
-                        }
-                    }
-                }
-            }
-        }
-
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(activity, f)
-
-        output_file = temp_parsed_dir / "training_log.json"
+        output_file = temp_parsed_dir.parent / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
-        # Should handle gracefully with zeros
-        stats = training_log["metadata"]["statistics"]
-        assert stats["total_distance_km"] == 0
-        assert stats["total_calories"] == 0
+        assert training_log["activities"][0]["tcx_metadata"]["total_trackpoints"] == 3
 
-    def test_aggregate_time_parsing(self, temp_parsed_dir):
+    def test_aggregate_time_parsing(self, temp_parsed_dir, time_parsing_payloads):
         """Test correct parsing of time strings."""
-        activities = [
-            {
-                "date": "20251201",
-                "metadata": {},
-                "sources": {
-                    "csv": {
-                        "data": {
-                            "summary": {
-                                "getdistance": 5.0,
-                                "time": "01:30:45",  # 1 hour 30 min 45 sec
-                                "calories": 300
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "date": "20251202",
-                "metadata": {},
-                "sources": {
-                    "csv": {
-                        "data": {
-                            "summary": {
-                                "getdistance": 3.0,
-                                "time": "00:25:15",  # 25 min 15 sec
-                                "calories": 180
-                            }
-                        }
-                    }
-                }
-            }
-        ]
-
-        for activity in activities:
+        for activity in time_parsing_payloads:
             activity_file = temp_parsed_dir / f"{activity['date']}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         output_file = temp_parsed_dir / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
         # Total time should be 1:30:45 + 0:25:15 = 1:56:00
         stats = training_log["metadata"]["statistics"]
+        assert stats["total_time_seconds"] == 6960
         assert stats["total_time_formatted"] == "01:56:00"
 
-    def test_aggregate_date_range(self, temp_parsed_dir):
+    def test_aggregate_date_range(self, temp_parsed_dir, date_range_payloads):
         """Test date range in statistics."""
-        activities = [
-            {"date": "20251120", "metadata": {}, "sources": {}},
-            {"date": "20251125", "metadata": {}, "sources": {}},
-            {"date": "20251201", "metadata": {}, "sources": {}}
-        ]
-
-        for activity in activities:
+        for activity in date_range_payloads:
             activity_file = temp_parsed_dir / f"{activity['date']}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         output_file = temp_parsed_dir / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
         stats = training_log["metadata"]["statistics"]
         assert stats["date_range"]["first_activity"] == "20251120"
         assert stats["date_range"]["last_activity"] == "20251201"
 
-    def test_aggregate_nonexistent_directory(self, temp_parsed_dir, capsys):
+    def test_aggregate_nonexistent_directory(self, temp_parsed_dir, capfd):
         """Test with non-existent directory."""
         nonexistent_dir = temp_parsed_dir / "nonexistent"
         output_file = temp_parsed_dir / "training_log.json"
 
         aggregate_training_data(str(nonexistent_dir), str(output_file))
 
-        captured = capsys.readouterr()
+        captured = capfd.readouterr()
         assert "does not exist" in captured.out
 
         # Output file should not be created
         assert not output_file.exists()
 
-    def test_aggregate_empty_directory(self, temp_parsed_dir, capsys):
+    def test_aggregate_empty_directory(self, temp_parsed_dir, capfd):
         """Test with empty directory (no JSON files)."""
         output_file = temp_parsed_dir / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        captured = capsys.readouterr()
+        captured = capfd.readouterr()
         assert "No JSON files found" in captured.out
 
         # Output file should not be created
         assert not output_file.exists()
 
-    def test_aggregate_splits_included(self, temp_parsed_dir):
-        """Test that splits are included in activity summary."""
-        activity = {
-            "date": "20251202",
-            "metadata": {},
-            "sources": {
-                "csv": {
-                    "data": {
-                        "summary": {"getdistance": 3.0},
-                        "splits": [
-                            {"split": "1", "getdistance": 1.0, "time": "00:07:00"},
-                            {"split": "2", "getdistance": 1.0, "time": "00:07:10"},
-                            {"split": "3", "getdistance": 1.0, "time": "00:07:20"}
-                        ]
-                    }
-                }
-            }
+    def test_aggregate_ignores_non_json_entries(self, temp_parsed_dir, sample_parsed_activity):
+        """Test that only JSON files are aggregated, in name order."""
+        for date in ("20251203", "20251201"):
+            _dump(temp_parsed_dir / f"{date}.json", dict(sample_parsed_activity, date=date))
+        (temp_parsed_dir / "notes.txt").write_text("not an activity")
+        (temp_parsed_dir / "backup.json").mkdir()
+
+        output_file = temp_parsed_dir.parent / "training_log.json"
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
+
+        training_log = _load(output_file)
+
+        assert [a["date"] for a in training_log["activities"]] == ["20251201", "20251203"]
+
+    def test_aggregate_skips_corrupt_files(self, temp_parsed_dir, sample_parsed_activity, capfd):
+        """Test that empty, truncated and non-activity files are reported and skipped."""
+        _dump(temp_parsed_dir / "20251202.json", sample_parsed_activity)
+        (temp_parsed_dir / "20251203.json").write_text("")
+        (temp_parsed_dir / "20251204.json").write_text('{"date": "2025')
+        (temp_parsed_dir / "20251205.json").write_text('{"sources": {}}')
+        # Well-formed JSON with the wrong shape
+        (temp_parsed_dir / "20251206.json").write_text('{"date": "20251206", "sources": []}')
+        (temp_parsed_dir / "20251207.json").write_text(
+            '{"date": "20251207", "sources": {"tcx": {"data": []}}}')
+
+        output_file = temp_parsed_dir.parent / "training_log.json"
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
+
+        captured = capfd.readouterr()
+        for name in ("20251203", "20251204", "20251205", "20251206", "20251207"):
+            assert f"Skipping {name}.json" in captured.out
+
+        training_log = _load(output_file)
+
+        assert training_log["metadata"]["total_activities"] == 1
+        assert [a["date"] for a in training_log["activities"]] == ["20251202"]
+        assert training_log["metadata"]["statistics"]["date_range"] == {
+            "first_activity": "20251202",
+            "last_activity": "20251202"
         }
 
+    def test_aggregate_chunks_only_parsed_activities(self, temp_parsed_dir, sample_parsed_activity):
+        """Test the chunking decision counts activities that parsed, not files found."""
+        for date in ("20251201", "20251202", "20251203"):
+            _dump(temp_parsed_dir / f"{date}.json", dict(sample_parsed_activity, date=date))
+        for date in ("20251204", "20251205", "20251206"):
+            (temp_parsed_dir / f"{date}.json").write_text("")
+
+        output_file = temp_parsed_dir.parent / "training_log.json"
+        chunks_dir = temp_parsed_dir.parent / "chunks"
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=5,
+                                chunks_dir=str(chunks_dir))
+
+        # 6 files but only 3 activities fit in one chunk: a single log is written
+        assert not chunks_dir.exists()
+        training_log = _load(output_file)
+        assert training_log["metadata"]["total_activities"] == 3
+        assert [a["date"] for a in training_log["activities"]] == [
+            "20251201", "20251202", "20251203"]
+
+    def test_aggregate_without_orjson(self, temp_parsed_dir, sample_parsed_activity, monkeypatch):
+        """Test aggregation falls back to stdlib json when orjson is missing."""
+        monkeypatch.setattr(create_training_log, "orjson", None)
+        monkeypatch.setattr(json_io, "orjson", None)
+
         activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(activity, f)
+        _dump(activity_file, sample_parsed_activity)
 
         output_file = temp_parsed_dir / "training_log.json"
         aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
-        activity_data = training_log["activities"][0]
-        assert "splits" in activity_data
-        assert len(activity_data["splits"]) == 3
-        assert activity_data["splits"][0]["split"] == "1"
+        assert training_log["metadata"]["total_activities"] == 1
+        assert training_log["activities"][0]["summary"]["getdistance"] == 2.0
 
+    def test_aggregate_jsonl_output(self, temp_parsed_dir, sample_parsed_activity):
+        """Test streaming activities to a JSON Lines file with metadata sidecar."""
+        for date in ("20251201", "20251202"):
+            activity = dict(sample_parsed_activity, date=date)
+            _dump(temp_parsed_dir / f"{date}.json", activity)
 
-class TestMainFunction:
-    """Tests for the main function and CLI."""
+        output_file = temp_parsed_dir / "training_log.json"
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), jsonl=True)
+
+        jsonl_file = temp_parsed_dir / "training_log.jsonl"
+        meta_file = temp_parsed_dir / "training_log.meta.json"
+        assert jsonl_file.exists()
+        assert meta_file.exists()
+        assert not output_file.exists()
 
-    def test_main_default_arguments(self, temp_parsed_dir, sample_parsed_activity, monkeypatch):
-        """Test main function with default arguments."""
-        import sys
-        from create_training_log import main
+        lines = jsonl_file.read_text(encoding='utf-8').splitlines()
+        activities = [json.loads(line) for line in lines]
+        assert [a["date"] for a in activities] == ["20251201", "20251202"]
+        assert activities[0]["summary"]["getdistance"] == 2.0
+
+        meta = _load(meta_file)
+        assert meta["metadata"]["total_activities"] == 2
+        assert meta["metadata"]["activities_file"] == "training_log.jsonl"
+        assert meta["metadata"]["statistics"] == dict(
+            calculate_chunk_statistics(activities),
+            date_range={"first_activity": "20251201", "last_activity": "20251202"}
+        )
 
-        # Create a parsed activity file
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(sample_parsed_activity, f)
+    def test_aggregate_parallel_matches_serial(self, temp_parsed_dir, sample_parsed_activity):
+        """Test that parsing with worker processes gives the same log as serial."""
+        for day in range(1, 6):
+            activity = dict(sample_parsed_activity, date=f"202512{day:02d}")
+            _dump(temp_parsed_dir / f"202512{day:02d}.json", activity)
 
-        # Change to temp directory and run
-        monkeypatch.chdir(temp_parsed_dir.parent)
-        monkeypatch.setattr(sys, "argv", [
-            "create_training_log.py",
-            "--input-dir", str(temp_parsed_dir)
-        ])
+        serial_file = temp_parsed_dir.parent / "serial.json"
+        parallel_file = temp_parsed_dir.parent / "parallel.json"
+        aggregate_training_data(str(temp_parsed_dir), str(serial_file), chunk_size=0, workers=1)
+        aggregate_training_data(str(temp_parsed_dir), str(parallel_file), chunk_size=0, workers=2)
 
-        main()
+        serial = _load(serial_file)
+        parallel = _load(parallel_file)
+
+        assert parallel["activities"] == serial["activities"]
+        assert parallel["metadata"]["statistics"] == serial["metadata"]["statistics"]
+
+    @pytest.mark.parametrize("jsonl", [False, True])
+    def test_iter_activities(self, temp_parsed_dir, sample_parsed_activity, jsonl):
+        """Test iter_activities reads back every activity of a JSON or JSONL log."""
+        for date in ("20251202", "20251204", "20251206"):
+            activity = dict(sample_parsed_activity, date=date)
+            _dump(temp_parsed_dir / f"{date}.json", activity)
 
-        # Check output file was created
         output_file = temp_parsed_dir.parent / "training_log.json"
-        assert output_file.exists()
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0, jsonl=jsonl)
 
-    def test_main_custom_output(self, temp_parsed_dir, sample_parsed_activity, monkeypatch):
-        """Test main function with custom output file."""
-        import sys
-        from create_training_log import main
+        if jsonl:
+            log_file = output_file.with_suffix('.jsonl')
+            metadata = _load(output_file.with_suffix('.meta.json'))["metadata"]
+        else:
+            log_file = output_file
+            metadata = _load(output_file)["metadata"]
 
-        # Create a parsed activity file
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(sample_parsed_activity, f)
+        activities = list(iter_activities(log_file))
+        assert [a["date"] for a in activities] == ["20251202", "20251204", "20251206"]
 
-        custom_output = temp_parsed_dir / "custom_log.json"
+        # Statistics can be recomputed from the stream
+        statistics = calculate_chunk_statistics(iter_activities(log_file))
+        assert statistics["total_distance_km"] == metadata["statistics"]["total_distance_km"]
+        assert statistics["total_time_seconds"] == metadata["statistics"]["total_time_seconds"]
 
-        monkeypatch.setattr(sys, "argv", [
-            "create_training_log.py",
-            "--input-dir", str(temp_parsed_dir),
-            "--output", str(custom_output)
-        ])
+    def test_iter_activities_without_ijson(self, temp_parsed_dir, sample_parsed_activity, monkeypatch):
+        """Test iter_activities falls back to loading the whole JSON log."""
+        monkeypatch.setattr(create_training_log, "ijson", None)
 
-        main()
+        _dump(temp_parsed_dir / "20251202.json", sample_parsed_activity)
 
-        # Check custom output file was created
-        assert custom_output.exists()
+        output_file = temp_parsed_dir.parent / "training_log.json"
+        aggregate_training_data(str(temp_parsed_dir), str(output_file), chunk_size=0)
 
-    def test_main_with_include_gps_flag(self, temp_parsed_dir, monkeypatch):
-        """Test main function with --include-gps flag."""
-        import sys
-        from create_training_log import main
+        assert [a["date"] for a in iter_activities(output_file)] == [sample_parsed_activity["date"]]
 
-        # Note: The current implementation doesn't actually use this flag
-        # but we test that it doesn't cause errors
-        activity = {
-            "date": "20251202",
-            "metadata": {},
-            "sources": {
-                "csv": {"data": {"summary": {"getdistance": 2.0}}}
-            }
-        }
 
-        activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(activity, f)
+class TestMainFunction:
+    """Tests for the main function and CLI."""
 
-        output_file = temp_parsed_dir / "training_log.json"
+    @pytest.mark.parametrize("argv_extra, output_name", [
+        pytest.param([], "training_log.json", id="default_arguments"),
+        pytest.param(["--output", "custom_log.json"], "custom_log.json", id="custom_output"),
+        # The current implementation doesn't use --include-gps, but it
+        # must still be accepted
+        pytest.param(["--include-gps"], "training_log.json", id="include_gps_flag")
+    ])
+    def test_main_writes_output(self, temp_parsed_dir, sample_parsed_activity, monkeypatch,
+                                argv_extra, output_name):
+        """Test main function writes the training log for each command line variant."""
+        _dump(temp_parsed_dir / "20251202.json", sample_parsed_activity)
 
-        monkeypatch.setattr(sys, "argv", [
-            "create_training_log.py",
-            "--input-dir", str(temp_parsed_dir),
-            "--output", str(output_file),
-            "--include-gps"
-        ])
+        # Change to temp directory and run
+        monkeypatch.chdir(temp_parsed_dir.parent)
+        main(["--input-dir", str(temp_parsed_dir), *argv_extra])
 
-        main()
+        # Check output file was created
+        assert (temp_parsed_dir.parent / output_name).exists()
 
-        assert output_file.exists()
+    def test_main_with_argv(self, temp_parsed_dir, sample_parsed_activity, monkeypatch):
+        """Test main accepts an explicit argument list and reuses its parser."""
+        _dump(temp_parsed_dir / "20251202.json", sample_parsed_activity)
+        monkeypatch.chdir(temp_parsed_dir.parent)
+
+        main(["--input-dir", str(temp_parsed_dir), "--output", "first.json", "--pretty"])
+        main(["--input-dir", str(temp_parsed_dir), "--output", "second.json"])
+
+        assert (temp_parsed_dir.parent / "first.json").read_text().startswith('{\n')
+        assert (temp_parsed_dir.parent / "second.json").exists()
+        assert _build_parser() is _build_parser()
 
 
 class TestChunkingFunctions:
@@ -523,6 +529,31 @@ class TestChunkingFunctions:
         assert stats["total_time_formatted"] == "00:30:00"
         assert stats["total_calories"] == 250
 
+    def test_calculate_chunk_statistics_with_missing_values(self):
+        """Test statistics treat None, missing and padded values sensibly."""
+        activities = [
+            {"summary": {"getdistance": None, "time": None, "calories": None}},
+            {"summary": {"getdistance": "2.5", "time": " 00:10:05 ", "calories": 99.0}},
+            {"summary": {}}
+        ]
+
+        stats = calculate_chunk_statistics(activities)
+
+        assert stats["total_distance_km"] == 2.5
+        assert stats["total_time_formatted"] == "00:10:05"
+        assert stats["total_calories"] == 99
+
+    def test_calculate_chunk_statistics_exact_distance(self):
+        """Test distance totals do not pick up floating point drift."""
+        activities = [{"summary": {"getdistance": 0.01}} for _ in range(30)]
+        activities.append({"summary": {"getdistance": "nan"}})
+        activities.append({"summary": {"getdistance": "inf"}})
+
+        stats = calculate_chunk_statistics(activities)
+
+        assert stats["total_distance_km"] == 0.3
+        assert stats["average_distance_per_run"] == 0.01
+
     def test_calculate_chunk_statistics_without_summary(self):
         """Test statistics with activities missing summary."""
         activities = [
@@ -541,6 +572,63 @@ class TestChunkingFunctions:
         assert stats["total_distance_km"] == 2.0
         assert stats["total_calories"] == 120
 
+    def test_calculate_chunk_statistics_from_stream(self):
+        """Test statistics can be computed from a generator of activities."""
+        activities = (
+            {"summary": {"getdistance": 4.0, "time": "00:20:00", "calories": 200}}
+            for _ in range(3)
+        )
+
+        stats = calculate_chunk_statistics(activities)
+
+        assert stats["total_distance_km"] == 12.0
+        assert stats["total_time_formatted"] == "01:00:00"
+        assert stats["average_distance_per_run"] == 4.0
+
+    @pytest.mark.parametrize("pretty", [True, False])
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_write_log_matches_full_dump(self, temp_parsed_dir, sample_parsed_activity,
+                                         monkeypatch, use_orjson, pretty):
+        """Test that assembling a log from encoded activities equals dumping it whole."""
+        if not use_orjson:
+            monkeypatch.setattr(create_training_log, "orjson", None)
+
+        metadata = {"total_activities": 2, "statistics": {"total_calories": 172}}
+        activities = [sample_parsed_activity, {"date": "20251203", "note": "Løp ✓"}]
+        encoded = [_encode_activity(a, pretty=pretty) for a in activities]
+
+        expected_file = temp_parsed_dir / "expected.json"
+        _dump_json({"metadata": metadata, "activities": activities}, expected_file, pretty)
+        written_file = temp_parsed_dir / "written.json"
+        _write_log(written_file, metadata, encoded, pretty)
+        assert written_file.read_bytes() == expected_file.read_bytes()
+
+        with tempfile.TemporaryFile() as spool:
+            spool.write(_activity_separator(pretty).join(encoded))
+            spool.seek(0)
+            _write_log(written_file, metadata, spool, pretty)
+        assert written_file.read_bytes() == expected_file.read_bytes()
+
+        _dump_json({"metadata": metadata, "activities": []}, expected_file, pretty)
+        _write_log(written_file, metadata, [], pretty)
+        assert written_file.read_bytes() == expected_file.read_bytes()
+
+    def test_aggregate_compact_by_default(self, temp_parsed_dir, sample_parsed_activity):
+        """Test logs are compact unless pretty is requested, with the same content."""
+        _dump(temp_parsed_dir / "20251202.json", sample_parsed_activity)
+
+        compact_file = temp_parsed_dir.parent / "compact.json"
+        pretty_file = temp_parsed_dir.parent / "pretty.json"
+        aggregate_training_data(str(temp_parsed_dir), str(compact_file), chunk_size=0)
+        aggregate_training_data(str(temp_parsed_dir), str(pretty_file), chunk_size=0, pretty=True)
+
+        compact = compact_file.read_text(encoding='utf-8')
+        pretty = pretty_file.read_text(encoding='utf-8')
+        assert "\n" not in compact
+        assert pretty.startswith('{\n  "metadata": {')
+        assert len(compact) < len(pretty)
+        assert json.loads(compact)["activities"] == json.loads(pretty)["activities"]
+
     def test_create_index_file(self, temp_parsed_dir):
         """Test index file creation."""
         chunks_info = [
@@ -577,8 +665,7 @@ class TestChunkingFunctions:
 
         assert index_file.exists()
 
-        with open(index_file, 'r') as f:
-            index_data = json.load(f)
+        index_data = _load(index_file)
 
         assert "metadata" in index_data
         assert index_data["metadata"]["total_chunks"] == 2
@@ -606,8 +693,7 @@ class TestChunkingFunctions:
                 }
             }
             activity_file = temp_parsed_dir / f"activity_{i:02d}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         # Aggregate with chunk_size=10
         output_file = temp_parsed_dir / "training_log.json"
@@ -631,26 +717,66 @@ class TestChunkingFunctions:
         assert index_file.exists()
 
         # Verify chunk contents
-        with open(chunk1, 'r') as f:
-            chunk1_data = json.load(f)
+        chunk1_data = _load(chunk1)
         assert chunk1_data["metadata"]["total_activities"] == 10
         assert chunk1_data["metadata"]["chunk_number"] == 1
         assert len(chunk1_data["activities"]) == 10
 
-        with open(chunk3, 'r') as f:
-            chunk3_data = json.load(f)
+        chunk3_data = _load(chunk3)
         assert chunk3_data["metadata"]["total_activities"] == 5
         assert chunk3_data["metadata"]["chunk_number"] == 3
         assert len(chunk3_data["activities"]) == 5
 
         # Verify index file
-        with open(index_file, 'r') as f:
-            index_data = json.load(f)
+        index_data = _load(index_file)
         assert index_data["metadata"]["total_chunks"] == 3
         assert index_data["metadata"]["total_activities"] == 25
 
         # Temp directory cleanup is automatic, no manual cleanup needed
 
+    def test_aggregate_chunk_statistics(self, temp_parsed_dir):
+        """Test per-chunk statistics and date ranges in chunks and index."""
+        for i in range(1, 8):
+            activity = {
+                "date": f"202512{i:02d}",
+                "metadata": {},
+                "sources": {
+                    "csv": {
+                        "data": {
+                            "summary": {
+                                "getdistance": float(i),
+                                "time": "00:10:00",
+                                "calories": 100 * i
+                            }
+                        }
+                    }
+                }
+            }
+            _dump(temp_parsed_dir / f"202512{i:02d}.json", activity)
+
+        chunks_dir = temp_parsed_dir.parent / "chunks"
+        aggregate_training_data(
+            str(temp_parsed_dir),
+            str(temp_parsed_dir.parent / "training_log.json"),
+            chunk_size=3,
+            chunks_dir=str(chunks_dir)
+        )
+
+        index_data = _load(chunks_dir / "training_log_index.json")
+
+        stats = [c["statistics"] for c in index_data["chunks"]]
+        assert [s["total_distance_km"] for s in stats] == [6.0, 15.0, 7.0]
+        assert [s["total_calories"] for s in stats] == [600, 1500, 700]
+        assert [s["total_time_formatted"] for s in stats] == ["00:30:00", "00:30:00", "00:10:00"]
+        assert [s["average_distance_per_run"] for s in stats] == [2.0, 5.0, 7.0]
+        assert index_data["chunks"][1]["date_range"] == {
+            "first_activity": "20251204",
+            "last_activity": "20251206"
+        }
+
+        chunk2_data = _load(chunks_dir / "training_log_part2.json")
+        assert chunk2_data["metadata"]["statistics"] == stats[1]
+
     def test_aggregate_with_custom_chunk_pattern(self, temp_parsed_dir):
         """Test chunking with custom file pattern."""
         # Create 15 activities
@@ -671,8 +797,7 @@ class TestChunkingFunctions:
                 }
             }
             activity_file = temp_parsed_dir / f"activity_{i:02d}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         # Aggregate with custom chunk pattern
         output_file = temp_parsed_dir / "training_log.json"
@@ -716,8 +841,7 @@ class TestChunkingFunctions:
                 }
             }
             activity_file = temp_parsed_dir / f"activity_{i:02d}.json"
-            with open(activity_file, 'w') as f:
-                json.dump(activity, f)
+            _dump(activity_file, activity)
 
         # Try to chunk with chunk_size=10 (more than total activities)
         output_file = temp_parsed_dir / "training_log.json"
@@ -734,8 +858,7 @@ class TestChunkingFunctions:
         # Chunks directory should not be created when not chunking
         assert not chunks_dir.exists()
 
-        with open(output_file, 'r') as f:
-            data = json.load(f)
+        data = _load(output_file)
         assert data["metadata"]["total_activities"] == 5
         assert len(data["activities"]) == 5
 
@@ -743,8 +866,7 @@ class TestChunkingFunctions:
         """Test that no chunking occurs with chunk_size=0."""
         # Create a parsed activity file
         activity_file = temp_parsed_dir / "20251202.json"
-        with open(activity_file, 'w') as f:
-            json.dump(sample_parsed_activity, f)
+        _dump(activity_file, sample_parsed_activity)
 
         # Call with chunk_size=0 to disable chunking
         output_file = temp_parsed_dir / "training_log.json"
@@ -755,8 +877,7 @@ class TestChunkingFunctions:
         assert output_file.exists()
         assert not chunks_dir.exists()
 
-        with open(output_file, 'r') as f:
-            training_log = json.load(f)
+        training_log = _load(output_file)
 
         assert training_log["metadata"]["total_activities"] == 1
         assert "chunk_number" not in training_log["metadata"]
@@ -0,0 +1,66 @@
+"""
+Tests for json_io.py module.
+"""
+
+import pytest
+import json
+import json_io
+from json_io import list_json_files, load_json, parse_json
+
+
+class TestLoadJson:
+    """Tests for load_json and parse_json."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_load_json(self, tmp_path, monkeypatch, use_orjson):
+        """Test loading a JSON file with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(json_io, "orjson", None)
+
+        json_file = tmp_path / "activity.json"
+        json_file.write_text(json.dumps({"date": "20251202", "title": "Løp"}), encoding="utf-8")
+
+        assert load_json(json_file) == {"date": "20251202", "title": "Løp"}
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("content", ["", "{"])
+    def test_load_json_empty_file(self, tmp_path, monkeypatch, use_orjson, content):
+        """Test empty files are rejected the same way with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(json_io, "orjson", None)
+
+        json_file = tmp_path / "activity.json"
+        json_file.write_text(content)
+
+        with pytest.raises(ValueError, match="file is empty"):
+            load_json(json_file)
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parse_json(self, monkeypatch, use_orjson):
+        """Test decoding JSON bytes with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(json_io, "orjson", None)
+
+        assert parse_json(b'{"a": [1, 2.5]}') == {"a": [1, 2.5]}
+
+    @pytest.mark.parametrize("raw", [b"", b"{"])
+    def test_parse_json_empty(self, raw):
+        """Test empty input is rejected like an empty file."""
+        with pytest.raises(ValueError, match="file is empty"):
+            parse_json(raw)
+
+
+class TestListJsonFiles:
+    """Tests for list_json_files function."""
+
+    def test_list_json_files_sorted(self, tmp_path):
+        """Test only JSON files are listed, sorted by name."""
+        for name in ("20251204.json", "20251202.json", "notes.txt", ".list_cache"):
+            (tmp_path / name).write_text("{}")
+        (tmp_path / "folder.json").mkdir()
+
+        assert list_json_files(tmp_path) == [tmp_path / "20251202.json", tmp_path / "20251204.json"]
+
+    def test_list_json_files_empty_dir(self, tmp_path):
+        """Test an empty directory gives an empty list."""
+        assert list_json_files(tmp_path) == []
@@ -65,10 +65,33 @@ Summary,2.00,00:14:15,136"""
         assert "avg_hr" not in result["splits"][0]
         assert result["summary"]["avg_hr"] == 136
 
-    def test_clean_split_row_numeric_conversions(self):
-        """Test _clean_split_row converts numeric values correctly."""
-        parser = CorosDataParser()
+    def test_parse_csv_splits_blank_and_short_rows(self, temp_data_dir):
+        """Test blank lines are skipped and short rows only fill leading columns."""
+        csv_content = """Split,GetDistance,Time,Avg HR
+
+1, 1.00 ,00:07:10
+Summary,2.00,00:14:15,136
+"""
+
+        csv_file = temp_data_dir / "test.csv"
+        csv_file.write_text(csv_content)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        result = parser.parse_csv_splits(csv_file)
+
+        assert result["splits"] == [{"split": "1", "getdistance": 1.0, "time": "00:07:10"}]
+        assert result["summary"]["avg_hr"] == 136
+
+    def test_parse_csv_splits_empty_file(self, temp_data_dir):
+        """Test an empty CSV gives no splits and an empty summary."""
+        csv_file = temp_data_dir / "test.csv"
+        csv_file.write_text("")
+
+        parser = CorosDataParser(str(temp_data_dir))
+        assert parser.parse_csv_splits(csv_file) == {"splits": [], "summary": {}}
 
+    def test_clean_split_row_numeric_conversions(self, shared_parser):
+        """Test _clean_split_row converts numeric values correctly."""
         row = {
             "GetDistance": "1.5",
             "Avg HR": "145",
@@ -77,7 +100,7 @@ Summary,2.00,00:14:15,136"""
             "": ""
         }
 
-        cleaned = parser._clean_split_row(row)
+        cleaned = shared_parser._clean_split_row(row)
 
         assert cleaned["getdistance"] == 1.5
         assert cleaned["avg_hr"] == 145
@@ -85,28 +108,22 @@ Summary,2.00,00:14:15,136"""
         assert cleaned["time"] == "00:07:10"
         assert "" not in cleaned
 
-    def test_clean_split_row_invalid_numeric(self):
+    def test_clean_split_row_invalid_numeric(self, shared_parser):
         """Test _clean_split_row handles invalid numeric values."""
-        parser = CorosDataParser()
-
         row = {
             "GetDistance": "N/A",
             "Avg HR": "invalid"
         }
 
-        cleaned = parser._clean_split_row(row)
+        cleaned = shared_parser._clean_split_row(row)
 
         # Should keep as string if conversion fails
         assert cleaned["getdistance"] == "N/A"
         assert cleaned["avg_hr"] == "invalid"
 
-    def test_parse_tcx(self, temp_data_dir, sample_tcx_content):
+    def test_parse_tcx(self, shared_parser, materialized_tcx):
         """Test parsing TCX file."""
-        tcx_file = temp_data_dir / "activity.tcx"
-        tcx_file.write_text(sample_tcx_content)
-
-        parser = CorosDataParser(str(temp_data_dir))
-        result = parser.parse_tcx(tcx_file)
+        result = shared_parser.parse_tcx(materialized_tcx)
 
         # Verify structure
         assert result["activity_type"] == "Running"
@@ -168,15 +185,106 @@ Summary,2.00,00:14:15,136"""
         assert "position" not in result["trackpoints"][0]
         assert result["trackpoints"][0]["heart_rate"] == 85
 
-    def test_get_text_helper_methods(self, temp_data_dir, sample_tcx_content):
-        """Test helper methods for extracting XML data."""
-        import xml.etree.ElementTree as ET
+    def test_parse_tcx_multiple_laps(self, temp_data_dir):
+        """Test laps and trackpoints are collected across every lap in order."""
+        trackpoint = """
+          <Trackpoint>
+            <Time>{time}</Time>
+            <DistanceMeters>{dist}</DistanceMeters>
+          </Trackpoint>"""
+        laps = []
+        for lap_index in range(3):
+            points = "".join(
+                trackpoint.format(time=f"T{lap_index}-{i}", dist=float(lap_index * 10 + i))
+                for i in range(4)
+            )
+            laps.append(f"""
+      <Lap StartTime="lap{lap_index}">
+        <DistanceMeters>{1000.0 * (lap_index + 1)}</DistanceMeters>
+        <Track>{points}
+          <Trackpoint><Time>time-only</Time></Trackpoint>
+        </Track>
+      </Lap>""")
+        tcx_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities>
+    <Activity Sport="Running">
+      <Id>first</Id>{"".join(laps)}
+    </Activity>
+    <Activity Sport="Biking">
+      <Id>second</Id>
+    </Activity>
+  </Activities>
+</TrainingCenterDatabase>"""
 
         tcx_file = temp_data_dir / "activity.tcx"
-        tcx_file.write_text(sample_tcx_content)
+        tcx_file.write_text(tcx_content)
 
         parser = CorosDataParser(str(temp_data_dir))
-        tree = ET.parse(tcx_file)
+        result = parser.parse_tcx(tcx_file)
+
+        assert result["activity_type"] == "Running"
+        assert result["activity_id"] == "first"
+        assert [lap["start_time"] for lap in result["laps"]] == ["lap0", "lap1", "lap2"]
+        assert result["laps"][2]["distance_meters"] == 3000.0
+        # Time-only trackpoints are dropped
+        assert len(result["trackpoints"]) == 12
+        assert result["trackpoints"][5] == {"time": "T1-1", "distance_m": 11.0}
+
+    def test_parse_tcx_trackpoint_limit(self, temp_data_dir, monkeypatch):
+        """Test trackpoints stop at MAX_TRACKPOINTS while later laps are still read."""
+        trackpoint = "<Trackpoint><Time>{}</Time><AltitudeMeters>1.0</AltitudeMeters></Trackpoint>"
+        laps = "".join(
+            f'<Lap StartTime="lap{lap_index}"><Track>'
+            + "".join(trackpoint.format(f"T{lap_index}-{i}") for i in range(3))
+            + "</Track></Lap>"
+            for lap_index in range(3)
+        )
+        tcx_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities>
+    <Activity Sport="Running">
+      <Id>first</Id>{laps}
+    </Activity>
+  </Activities>
+</TrainingCenterDatabase>"""
+
+        tcx_file = temp_data_dir / "activity.tcx"
+        tcx_file.write_text(tcx_content)
+        monkeypatch.setattr(CorosDataParser, "MAX_TRACKPOINTS", 4)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        result = parser.parse_tcx(tcx_file)
+
+        assert [tp["time"] for tp in result["trackpoints"]] == ["T0-0", "T0-1", "T0-2", "T1-0"]
+        assert len(result["laps"]) == 3
+
+    def test_parse_tcx_columnar_trackpoints(self, temp_data_dir, sample_tcx_content):
+        """Test the columnar layout holds the same values as the per-point dicts."""
+        tcx_file = temp_data_dir / "activity.tcx"
+        tcx_file.write_text(sample_tcx_content)
+
+        points = CorosDataParser(str(temp_data_dir)).parse_tcx(tcx_file)["trackpoints"]
+        columnar = CorosDataParser(str(temp_data_dir), columnar_trackpoints=True).parse_tcx(tcx_file)
+
+        trackpoints = columnar["trackpoints"]
+        assert trackpoints["columns"] == list(CorosDataParser.TRACKPOINT_COLUMNS)
+        rows = [dict(zip(trackpoints["columns"], row)) for row in zip(*trackpoints["data"])]
+        assert len(rows) == len(points) == 2
+        for row, point in zip(rows, points):
+            assert row["time"] == point["time"]
+            assert {"lat": row["lat"], "lon": row["lon"]} == point["position"]
+            assert row["altitude_m"] == point["altitude_m"]
+            assert row["heart_rate"] == point["heart_rate"]
+            assert row["speed_ms"] == point.get("speed_ms")
+        assert len(columnar["laps"]) == 1
+
+    def test_get_text_helper_methods(self, shared_parser, materialized_tcx):
+        """Test helper methods for extracting XML data."""
+        import xml.etree.ElementTree as ET
+
+        parser = shared_parser
+        tree = ET.parse(materialized_tcx)
         root = tree.getroot()
 
         ns = {'tcx': 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2'}
@@ -195,11 +303,11 @@ Summary,2.00,00:14:15,136"""
         hr = parser._get_int(lap, 'tcx:AverageHeartRateBpm/tcx:Value', ns)
         assert hr == 136
 
-    def test_get_methods_with_none(self):
+    def test_get_methods_with_none(self, shared_parser):
         """Test helper methods return None for missing elements."""
         import xml.etree.ElementTree as ET
 
-        parser = CorosDataParser()
+        parser = shared_parser
         element = ET.fromstring("<root></root>")
         ns = {}
 
@@ -207,16 +315,30 @@ Summary,2.00,00:14:15,136"""
         assert parser._get_float(element, "missing", ns) is None
         assert parser._get_int(element, "missing", ns) is None
 
-    def test_get_float_with_invalid_value(self):
+    def test_get_float_with_invalid_value(self, shared_parser):
         """Test _get_float with invalid numeric value."""
         import xml.etree.ElementTree as ET
 
-        parser = CorosDataParser()
+        parser = shared_parser
         element = ET.fromstring("<root><value>invalid</value></root>")
         ns = {}
 
         assert parser._get_float(element, "value", ns) is None
 
+    def test_get_int_with_decimal_and_invalid_values(self, shared_parser):
+        """Test _get_int accepts plain and decimal integers and rejects invalid text."""
+        import xml.etree.ElementTree as ET
+
+        parser = shared_parser
+        element = ET.fromstring(
+            "<root><a> 85 </a><b>148.0</b><c>1e2</c><d>inf</d><e>invalid</e></root>")
+
+        assert parser._get_int(element, "a") == 85
+        assert parser._get_int(element, "b") == 148
+        assert parser._get_int(element, "c") == 100
+        assert parser._get_int(element, "d") is None
+        assert parser._get_int(element, "e") is None
+
     def test_parse_fit_without_fitparse(self, temp_data_dir, monkeypatch):
         """Test parse_fit when fitparse is not installed."""
         # Mock ImportError for fitparse
@@ -241,6 +363,61 @@ Summary,2.00,00:14:15,136"""
         assert "error" in result
         assert "fitparse library not installed" in result["error"]
 
+    def test_parse_fit_does_not_retain_messages(self, temp_data_dir, monkeypatch):
+        """Test parse_fit collects messages while dropping fitparse's message cache."""
+        import sys
+        import types
+        from collections import namedtuple
+
+        Field = namedtuple("Field", "name value")
+        cache_sizes = []
+
+        class Message:
+            def __init__(self, name, fields):
+                self.name = name
+                self.fields = fields
+
+            def __iter__(self):
+                return iter(self.fields)
+
+        class FakeFitFile:
+            def __init__(self, path):
+                self._messages = []
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_):
+                pass
+
+            def get_messages(self, name=None):
+                messages = [
+                    Message("record", [Field("heart_rate", 120), Field("cadence", None)]),
+                    Message("record", [Field("heart_rate", 125)]),
+                    Message("lap", [Field("total_distance", 1000.0)]),
+                    Message("session", [Field("sport", "running")]),
+                ]
+                for message in messages:
+                    cache_sizes.append(len(self._messages))
+                    self._messages.append(message)
+                    if message.name in name:
+                        yield message
+
+        fake_fitparse = types.ModuleType("fitparse")
+        fake_fitparse.FitFile = FakeFitFile
+        monkeypatch.setitem(sys.modules, "fitparse", fake_fitparse)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        result = parser.parse_fit(temp_data_dir / "activity.fit")
+
+        assert result == {
+            "records": [{"heart_rate": 120}, {"heart_rate": 125}],
+            "laps": [{"total_distance": 1000.0}],
+            "session": {"sport": "running"},
+        }
+        # Each message is dropped from the cache once it has been consumed
+        assert max(cache_sizes) <= 1
+
     def test_parse_activity(self, sample_activity_folder):
         """Test parsing a complete activity folder."""
         parser = CorosDataParser(str(sample_activity_folder.parent))
@@ -280,6 +457,19 @@ Summary,2.00,00:14:15,136"""
         # Should have empty metadata
         assert result["metadata"] == {}
 
+    def test_parse_activity_includes_hidden_files(self, temp_data_dir, sample_csv_content):
+        """Test dotfiles are picked up like any other activity file."""
+        activity_dir = temp_data_dir / "20251202"
+        activity_dir.mkdir()
+
+        csv_file = activity_dir / ".activity.csv"
+        csv_file.write_text(sample_csv_content)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        result = parser.parse_activity(activity_dir, verbose=False)
+
+        assert result["sources"]["csv"]["file"] == ".activity.csv"
+
     def test_parse_activity_with_invalid_metadata(self, temp_data_dir, sample_csv_content):
         """Test parsing activity with invalid metadata JSON."""
         activity_dir = temp_data_dir / "20251202"
@@ -340,6 +530,135 @@ Summary,3.00,00:21:00,140"""
 
         assert data["date"] == "20251202"
 
+    def test_process_all_activities_parallel_matches_serial(self, tmp_path, sample_activity_folder, capsys):
+        """Test worker processes write the same files and print the same report as the serial loop."""
+        data_dir = sample_activity_folder.parent
+        for date in ("20251204", "20251206"):
+            activity_dir = data_dir / date
+            activity_dir.mkdir()
+            (activity_dir / "activity.csv").write_text(
+                "Split,GetDistance,Time,Avg HR\nSummary,3.00,00:21:00,140")
+
+        serial_dir = tmp_path / "serial"
+        parallel_dir = tmp_path / "parallel"
+        parser = CorosDataParser(str(data_dir))
+        parser.process_all_activities(str(serial_dir), workers=1)
+        serial_out = capsys.readouterr().out
+        parser.process_all_activities(str(parallel_dir), workers=2)
+        parallel_out = capsys.readouterr().out
+
+        assert "Avg HR: 140 bpm" in parallel_out
+        assert "Run type: outdoor" in parallel_out
+        # Same lines in the same (date) order, apart from the output directory
+        assert parallel_out.replace(str(parallel_dir), "OUT") == serial_out.replace(str(serial_dir), "OUT")
+
+        serial_files = sorted(p.name for p in serial_dir.glob("*.json"))
+        assert serial_files == sorted(p.name for p in parallel_dir.glob("*.json"))
+        assert len(serial_files) == 3
+        for name in serial_files:
+            with open(serial_dir / name, 'r') as f:
+                serial = json.load(f)
+            with open(parallel_dir / name, 'r') as f:
+                parallel = json.load(f)
+            serial.pop("parsed_at")
+            parallel.pop("parsed_at")
+            assert parallel == serial
+
+    def test_process_all_activities_parallel_save_error(self, tmp_path, sample_activity_folder, capsys):
+        """Test a failed save in a worker is reported as a save error under its own activity."""
+        data_dir = sample_activity_folder.parent
+        (data_dir / "20251204").mkdir()
+        (data_dir / "20251204" / "activity.csv").write_text(
+            "Split,GetDistance,Time,Avg HR\nSummary,3.00,00:21:00,140")
+
+        output_dir = tmp_path / "parsed"
+        # A directory in place of the output file makes the save fail
+        (output_dir / "20251204.json").mkdir(parents=True)
+
+        parser = CorosDataParser(str(data_dir))
+        parser.process_all_activities(str(output_dir), workers=2)
+
+        captured = capsys.readouterr()
+        blocks = {block.split("...")[0]: block for block in captured.out.split("\nProcessing ")[1:]}
+        assert list(blocks) == ["20251202", "20251204"]
+        assert "Error saving" in blocks["20251204"]
+        assert "Saved to" in blocks["20251202"]
+        assert "_save_activity" in captured.err
+
+    def test_saved_activity_identical_without_orjson(self, tmp_path, monkeypatch):
+        """Test orjson and the stdlib json fallback write the same bytes."""
+        import parse_coros_data
+        from datetime import datetime
+
+        activity = {
+            "date": "20251202",
+            "metadata": {"title": "Morgentur på Ørland"},
+            "sources": {"fit": {"data": {
+                "records": [{"timestamp": datetime(2025, 12, 2, 12, 42, 40), "speed": 2.5}],
+                "session": {},
+            }}},
+        }
+
+        orjson_file = tmp_path / "orjson.json"
+        stdlib_file = tmp_path / "stdlib.json"
+        parse_coros_data._save_activity(activity, orjson_file)
+        monkeypatch.setattr(parse_coros_data, "orjson", None)
+        parse_coros_data._save_activity(activity, stdlib_file)
+
+        assert orjson_file.read_bytes() == stdlib_file.read_bytes()
+        with open(stdlib_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data["sources"]["fit"]["data"]["records"][0]["timestamp"] == "2025-12-02 12:42:40"
+
+    def test_process_all_activities_only_date_folders(self, temp_data_dir, temp_parsed_dir,
+                                                      monkeypatch, capsys):
+        """Test only all-digit directories are processed, in sorted order."""
+        for name in ("20251204", "20251202", "notes", "2025-12-03"):
+            (temp_data_dir / name).mkdir()
+        (temp_data_dir / "20251205").write_text("not a folder")
+
+        processed = []
+
+        def mock_parse(self, date_folder, verbose=True):
+            processed.append(date_folder.name)
+            return {"date": date_folder.name, "sources": {}}
+
+        monkeypatch.setattr(CorosDataParser, "parse_activity", mock_parse)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        parser.process_all_activities(str(temp_parsed_dir))
+
+        assert processed == ["20251202", "20251204"]
+        assert "Found 2 activities" in capsys.readouterr().out
+
+    def test_process_all_activities_write_error(self, temp_data_dir, temp_parsed_dir,
+                                                monkeypatch, capsys):
+        """Test a failed save is reported under its own activity and later ones are still saved."""
+        import parse_coros_data
+
+        for name in ("20251202", "20251204", "20251206"):
+            (temp_data_dir / name).mkdir()
+
+        real_save = parse_coros_data._save_activity
+
+        def failing_save(activity_data, output_file):
+            if output_file.name == "20251204.json":
+                raise OSError("disk full")
+            real_save(activity_data, output_file)
+
+        monkeypatch.setattr(parse_coros_data, "_save_activity", failing_save)
+
+        parser = CorosDataParser(str(temp_data_dir))
+        parser.process_all_activities(str(temp_parsed_dir), workers=1)
+
+        out = capsys.readouterr().out
+        blocks = {block.split("...")[0]: block for block in out.split("\nProcessing ")[1:]}
+        assert "Error saving" in blocks["20251204"] and "disk full" in blocks["20251204"]
+        assert "Error saving" not in blocks["20251206"]
+        assert "Saved to" in blocks["20251206"]
+        assert sorted(p.name for p in temp_parsed_dir.glob("*.json")) == [
+            "20251202.json", "20251206.json"]
+
     def test_process_all_activities_empty_dir(self, temp_data_dir, temp_parsed_dir, capsys):
         """Test processing with no activity folders."""
         parser = CorosDataParser(str(temp_data_dir))
@@ -432,3 +751,13 @@ class TestMainFunction:
         # Check output files were created
         output_files = list(temp_parsed_dir.glob("*.json"))
         assert len(output_files) >= 1
+
+    def test_main_with_argv(self, temp_data_dir, temp_parsed_dir, sample_activity_folder):
+        """Test main accepts an explicit argument list and reuses its parser."""
+        from parse_coros_data import main, _build_parser
+
+        main(["--data-dir", str(temp_data_dir), "--output-dir", str(temp_parsed_dir),
+              "--single-date", "20251202"])
+
+        assert (temp_parsed_dir / "20251202.json").exists()
+        assert _build_parser() is _build_parser()
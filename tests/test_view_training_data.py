@@ -5,6 +5,7 @@ Tests for view_training_data.py module.
 import pytest
 import json
 from pathlib import Path
+import json_io
 from view_training_data import (
     parse_time_to_seconds,
     format_pace,
@@ -35,6 +36,14 @@ class TestParseTimeToSeconds:
         assert parse_time_to_seconds("N/A") == 0
         assert parse_time_to_seconds(None) == 0
 
+    def test_parse_malformed_fields(self):
+        """Test fields that are not plain digits, and non-string values, give 0."""
+        assert parse_time_to_seconds("aa:bb") == 0
+        assert parse_time_to_seconds("01:xx:10") == 0
+        assert parse_time_to_seconds("01::10") == 0
+        assert parse_time_to_seconds("1.5:30") == 0
+        assert parse_time_to_seconds(430) == 0
+
     def test_parse_with_whitespace(self):
         """Test parsing time with whitespace."""
         assert parse_time_to_seconds("  01:30:45  ") == 5445
@@ -76,6 +85,95 @@ class TestSummarizeActivity:
         assert "SUMMARY" in captured.out
         assert "SPLITS" in captured.out
 
+    def test_summarize_activity_without_orjson(self, temp_parsed_dir, sample_parsed_activity,
+                                               monkeypatch, capsys):
+        """Test summarize_activity falls back to stdlib json when orjson is missing."""
+        import view_training_data
+        monkeypatch.setattr(view_training_data, "orjson", None)
+        monkeypatch.setattr(json_io, "orjson", None)
+
+        activity_file = temp_parsed_dir / "20251202.json"
+        with open(activity_file, 'w') as f:
+            json.dump(sample_parsed_activity, f)
+
+        summarize_activity(activity_file)
+
+        captured = capsys.readouterr()
+        assert "Date: 20251202" in captured.out
+        assert "Test Morning Run" in captured.out
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("content", ["", "{"])
+    def test_summarize_activity_empty_file(self, temp_parsed_dir, monkeypatch, use_orjson, content):
+        """Test empty files are rejected the same way with and without orjson."""
+        import view_training_data
+        if not use_orjson:
+            monkeypatch.setattr(view_training_data, "orjson", None)
+            monkeypatch.setattr(json_io, "orjson", None)
+
+        activity_file = temp_parsed_dir / "20251202.json"
+        activity_file.write_text(content)
+
+        with pytest.raises(ValueError, match="file is empty"):
+            summarize_activity(activity_file)
+
+    @pytest.mark.parametrize("use_ijson", [True, False])
+    def test_summarize_activity_brief(self, temp_parsed_dir, sample_parsed_activity,
+                                      monkeypatch, capsys, use_ijson):
+        """Test brief summaries match the full one without the TCX and FIT sections."""
+        import view_training_data
+        if not use_ijson:
+            monkeypatch.setattr(view_training_data, "ijson", None)
+
+        activity = dict(sample_parsed_activity)
+        activity["sources"] = dict(activity["sources"],
+                                   fit={"data": {"records": [{}] * 3, "laps": [], "session": {}}})
+        activity_file = temp_parsed_dir / "20251202.json"
+        with open(activity_file, 'w') as f:
+            json.dump(activity, f)
+
+        summarize_activity(activity_file)
+        full = capsys.readouterr().out
+        summarize_activity(activity_file, brief=True)
+        brief = capsys.readouterr().out
+
+        assert "TCX DATA" in full and "FIT DATA" in full
+        assert brief == full[:full.index("\nTCX DATA")]
+        assert "Test Morning Run" in brief
+        assert "SPLITS (1 total)" in brief
+
+    @pytest.mark.parametrize("use_ijson", [True, False])
+    @pytest.mark.parametrize("order", ["fit_first", "csv_only_metadata_last", "csv_then_fit_metadata_last"])
+    def test_summarize_activity_brief_reordered_keys(self, temp_parsed_dir, sample_parsed_activity,
+                                                     monkeypatch, capsys, use_ijson, order):
+        """Test brief summaries keep the CSV data and metadata whatever the key order."""
+        import view_training_data
+        if not use_ijson:
+            monkeypatch.setattr(view_training_data, "ijson", None)
+
+        csv_source = sample_parsed_activity["sources"]["csv"]
+        fit_source = {"data": {"records": [{}] * 3, "laps": [], "session": {}}}
+        if order == "fit_first":
+            sources = {"fit": fit_source, "csv": csv_source}
+        elif order == "csv_only_metadata_last":
+            sources = {"csv": csv_source}
+        else:
+            sources = {"csv": csv_source, "fit": fit_source}
+        activity = {"date": "20251202", "sources": sources,
+                    "metadata": sample_parsed_activity["metadata"]}
+        activity_file = temp_parsed_dir / "20251202.json"
+        with open(activity_file, 'w') as f:
+            json.dump(activity, f)
+
+        summarize_activity(activity_file, brief=True)
+
+        captured = capsys.readouterr()
+        assert "Title: Test Morning Run" in captured.out
+        assert "Run Type:        outdoor" in captured.out
+        assert "Distance:        2.0 km" in captured.out
+        assert "SPLITS (1 total)" in captured.out
+        assert "FIT DATA" not in captured.out
+
     def test_summarize_activity_without_metadata(self, temp_parsed_dir, capsys):
         """Test summarizing activity without metadata."""
         activity = {
@@ -190,6 +288,71 @@ class TestSummarizeActivity:
         assert "Start Position" in captured.out
         assert "End Position" in captured.out
 
+    def test_summarize_activity_with_columnar_trackpoints(self, temp_parsed_dir, capsys):
+        """Test summarizing TCX data stored in the columnar trackpoint layout."""
+        activity = {
+            "date": "20251202",
+            "metadata": {},
+            "sources": {
+                "tcx": {
+                    "data": {
+                        "activity_type": "Running",
+                        "laps": [],
+                        "trackpoints": {
+                            "columns": ["time", "lat", "lon", "heart_rate"],
+                            "data": [
+                                ["2025-12-02T12:00:00Z", "2025-12-02T12:00:01Z", "2025-12-02T12:00:02Z"],
+                                [58.881234, 58.881244, None],
+                                [5.663456, 5.663466, None],
+                                [85, 90, 92],
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+
+        activity_file = temp_parsed_dir / "20251202.json"
+        with open(activity_file, 'w') as f:
+            json.dump(activity, f)
+
+        summarize_activity(activity_file)
+
+        captured = capsys.readouterr()
+        assert "3 GPS points" in captured.out
+        assert "Start Position:  58.881234, 5.663456" in captured.out
+        # The last point has no GPS fix
+        assert "End Position" not in captured.out
+
+    def test_summarize_activity_columnar_trackpoints_without_gps(self, temp_parsed_dir, capsys):
+        """Test columnar trackpoints recorded without lat/lon columns (e.g. treadmill runs)."""
+        activity = {
+            "date": "20251202",
+            "metadata": {},
+            "sources": {
+                "tcx": {
+                    "data": {
+                        "trackpoints": {
+                            "columns": ["time", "heart_rate"],
+                            "data": [["2025-12-02T12:00:00Z", "2025-12-02T12:00:01Z"], [85, 90]]
+                        }
+                    }
+                }
+            }
+        }
+
+        activity_file = temp_parsed_dir / "20251202.json"
+        with open(activity_file, 'w') as f:
+            json.dump(activity, f)
+
+        summarize_activity(activity_file)
+
+        captured = capsys.readouterr()
+        assert "2 GPS points" in captured.out
+        assert "Laps:            0" in captured.out
+        assert "Start Position" not in captured.out
+        assert "End Position" not in captured.out
+
     def test_summarize_activity_with_fit_data(self, temp_parsed_dir, capsys):
         """Test summarizing activity with FIT data."""
         activity = {
@@ -286,6 +449,199 @@ class TestMainFunction:
         assert "Found 1 activities" in captured.out
         assert "20251202" in captured.out
         assert "2.0 km" in captured.out
+        # Nothing is written to the data directory without --cache
+        assert not (temp_parsed_dir / ".list_cache").exists()
+
+    def test_main_list_parallel_matches_serial(self, temp_parsed_dir, sample_parsed_activity,
+                                               monkeypatch, capsys):
+        """Test --list prints the same lines, in order, when files are loaded by workers."""
+        import sys
+
+        for date in ("20251206", "20251202", "20251204"):
+            with open(temp_parsed_dir / f"{date}.json", 'w') as f:
+                json.dump(dict(sample_parsed_activity, date=date), f)
+
+        outputs = []
+        for workers in ("1", "2"):
+            monkeypatch.setattr(sys, "argv", [
+                "view_training_data.py",
+                "--dir", str(temp_parsed_dir),
+                "--list",
+                "--workers", workers
+            ])
+            main()
+            outputs.append(capsys.readouterr().out)
+
+        assert outputs[0] == outputs[1]
+        lines = [line for line in outputs[0].splitlines() if " km " in line]
+        assert [line.split()[0] for line in lines] == ["20251202", "20251204", "20251206"]
+
+    @pytest.mark.parametrize("use_ijson", [True, False])
+    def test_main_list_with_and_without_ijson(self, temp_parsed_dir, sample_parsed_activity,
+                                              monkeypatch, capsys, use_ijson):
+        """Test --list reads the same summary whether or not ijson streaming is used."""
+        import sys
+        import view_training_data
+        if not use_ijson:
+            monkeypatch.setattr(view_training_data, "ijson", None)
+
+        with open(temp_parsed_dir / "20251202.json", 'w') as f:
+            json.dump(sample_parsed_activity, f)
+        with open(temp_parsed_dir / "20251203.json", 'w') as f:
+            json.dump({"date": "20251203", "sources": {}}, f)
+
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--list"
+        ])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert "20251202  -  2.0 km  |  00:14:15  |  00:07:07/km" in captured.out
+        assert "20251203  -  N/A km  |  N/A  |  N/A/km" in captured.out
+
+    def test_main_list_uses_cache(self, temp_parsed_dir, sample_parsed_activity, monkeypatch, capsys):
+        """Test --list --cache reuses cached entries and reloads only changed files."""
+        import sys
+        import view_training_data
+
+        for date in ("20251202", "20251204"):
+            with open(temp_parsed_dir / f"{date}.json", 'w') as f:
+                json.dump(dict(sample_parsed_activity, date=date), f)
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--list",
+            "--cache"
+        ])
+
+        main()
+        first = capsys.readouterr().out
+        assert (temp_parsed_dir / ".list_cache").exists()
+
+        # Unchanged files are listed from the cache without being loaded
+        def fail(json_file):
+            raise AssertionError(f"{json_file.name} was loaded")
+
+        monkeypatch.setattr(view_training_data, "_list_entry", fail)
+        main()
+        assert capsys.readouterr().out == first
+
+        # A changed file is loaded again
+        monkeypatch.undo()
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--list",
+            "--cache"
+        ])
+        changed = dict(sample_parsed_activity, date="20251204")
+        changed["sources"] = {"csv": {"data": {"summary": {"getdistance": 12.5}}}}
+        with open(temp_parsed_dir / "20251204.json", 'w') as f:
+            json.dump(changed, f)
+
+        main()
+        captured = capsys.readouterr()
+        assert "20251204  -  12.5 km" in captured.out
+        assert "20251202  -  2.0 km" in captured.out
+
+    def test_main_list_cache_write_failure(self, temp_parsed_dir, sample_parsed_activity,
+                                           monkeypatch, capsys):
+        """Test --list --cache still lists everything when the cache cannot be written."""
+        import sys
+
+        with open(temp_parsed_dir / "20251202.json", 'w') as f:
+            json.dump(sample_parsed_activity, f)
+        # A directory in the cache file's place can be neither read nor written
+        (temp_parsed_dir / ".list_cache").mkdir()
+
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--list",
+            "--cache"
+        ])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert "20251202  -  2.0 km" in captured.out
+        assert captured.err == ""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_main_list_json(self, temp_parsed_dir, sample_parsed_activity, monkeypatch, capsys,
+                            use_orjson):
+        """Test --json prints the activity list as a JSON array."""
+        import sys
+        import view_training_data
+        if not use_orjson:
+            monkeypatch.setattr(view_training_data, "orjson", None)
+            monkeypatch.setattr(json_io, "orjson", None)
+
+        with open(temp_parsed_dir / "20251202.json", 'w') as f:
+            json.dump(sample_parsed_activity, f)
+        with open(temp_parsed_dir / "20251203.json", 'w') as f:
+            json.dump({"date": "20251203", "sources": {}}, f)
+
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--json"
+        ])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert captured.out.endswith("\n")
+        assert json.loads(captured.out) == [
+            {"date": "20251202", "distance_km": 2.0, "time": "00:14:15", "avg_pace": "00:07:07"},
+            {"date": "20251203", "distance_km": "N/A", "time": "N/A", "avg_pace": "N/A"},
+        ]
+
+    def test_main_list_json_without_stdout_buffer(self, temp_parsed_dir, sample_parsed_activity,
+                                                  monkeypatch):
+        """Test --json also works when stdout is replaced by a text-only stream."""
+        import io
+        import sys
+
+        with open(temp_parsed_dir / "20251202.json", 'w') as f:
+            json.dump(sample_parsed_activity, f)
+        stdout = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", stdout)
+
+        main(["--dir", str(temp_parsed_dir), "--json"])
+
+        assert json.loads(stdout.getvalue())[0]["date"] == "20251202"
+
+    def test_main_with_argv(self, temp_parsed_dir, sample_parsed_activity, capsys):
+        """Test main accepts an explicit argument list and reuses its parser."""
+        from view_training_data import _build_parser
+
+        with open(temp_parsed_dir / "20251202.json", 'w') as f:
+            json.dump(sample_parsed_activity, f)
+
+        main(["--dir", str(temp_parsed_dir), "--list"])
+
+        assert "20251202  -  2.0 km" in capsys.readouterr().out
+        assert _build_parser() is _build_parser()
+
+    def test_main_list_json_no_files(self, temp_parsed_dir, monkeypatch, capsys):
+        """Test --json prints an empty array when there are no activity files."""
+        import sys
+
+        monkeypatch.setattr(sys, "argv", [
+            "view_training_data.py",
+            "--dir", str(temp_parsed_dir),
+            "--json"
+        ])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert json.loads(captured.out) == []
+        assert "No JSON files found" in captured.err
 
     def test_main_view_specific_date(self, temp_parsed_dir, sample_parsed_activity, monkeypatch, capsys):
         """Test main function with --date flag."""
@@ -380,6 +736,19 @@ class TestMainFunction:
         assert "Date: 20251202" in captured.out
         assert "Run 1" in captured.out
         assert "Run 2" in captured.out
+        # Files are prefetched in the background but still shown in order
+        assert captured.out.index("Date: 20251201") < captured.out.index("Date: 20251202")
+
+    @pytest.mark.parametrize("mode", [[], ["--brief"], ["--date", "20251202"]])
+    def test_main_empty_file_same_error_in_every_mode(self, temp_parsed_dir, monkeypatch, mode):
+        """Test an empty activity file is reported as empty whichever mode reads it."""
+        import sys
+
+        (temp_parsed_dir / "20251202.json").write_text("")
+        monkeypatch.setattr(sys, "argv", ["view_training_data.py", "--dir", str(temp_parsed_dir), *mode])
+
+        with pytest.raises(ValueError, match="file is empty"):
+            main()
 
     def test_main_nonexistent_directory(self, temp_parsed_dir, monkeypatch, capsys):
         """Test main function with non-existent directory."""
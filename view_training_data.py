@@ -4,25 +4,72 @@ View and summarize parsed training data from Coros exports.
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from json_io import MIN_JSON_SIZE, list_json_files, load_json, parse_json
+
+
+# Files needed before --list uses a process pool by default. A --list entry
+# only needs the CSV summary; with ijson streaming that is ~0.5 ms per file
+# (~4 ms with a full load), against ~10 ms to start and join a pool, so it
+# takes a few dozen files for the pool to pay off
+PARALLEL_MIN_FILES = 32
+
+
+def _prefetch(paths):
+    """
+    Yield (path, file contents) in order, reading the next file on a
+    background thread while the current one is decoded and printed.
+    """
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        pending = reader.submit(Path.read_bytes, paths[0])
+        for i, path in enumerate(paths):
+            raw = pending.result()
+            if i + 1 < len(paths):
+                pending = reader.submit(Path.read_bytes, paths[i + 1])
+            yield path, raw
+
 
 def parse_time_to_seconds(time_str):
-    """Convert HH:MM:SS format to total seconds."""
-    if not time_str or time_str == 'N/A':
+    """
+    Convert HH:MM:SS or MM:SS format to total seconds.
+
+    Returns 0 for missing values ('', 'N/A', None, non-strings) and for
+    fields that are not plain digits, and None when the string has
+    neither two nor three fields.
+    """
+    if not time_str or time_str == 'N/A' or not isinstance(time_str, str):
         return 0
-    try:
-        parts = time_str.strip().split(':')
-        if len(parts) == 3:
-            h, m, s = parts
+    # The fields are validated up front, so no exception is raised for bad input
+    parts = time_str.strip().split(':')
+    if len(parts) == 3:
+        h, m, s = parts
+        if h.isdecimal() and m.isdecimal() and s.isdecimal():
             return int(h) * 3600 + int(m) * 60 + int(s)
-        elif len(parts) == 2:
-            m, s = parts
+        return 0
+    if len(parts) == 2:
+        m, s = parts
+        if m.isdecimal() and s.isdecimal():
             return int(m) * 60 + int(s)
-    except:
         return 0
+    return None
 
 
 def format_pace(pace_str):
@@ -32,107 +79,316 @@ def format_pace(pace_str):
     return pace_str.strip()
 
 
-def summarize_activity(json_file):
-    """Print a summary of a single activity."""
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+def trackpoint_endpoints(trackpoints):
+    """
+    Return (count, first_position, last_position) for TCX trackpoints.
+
+    Accepts both the list-of-points layout and the columnar layout written by
+    parse_coros_data.py --columnar-trackpoints. Positions are {'lat', 'lon'}
+    dicts, or None when that point has no GPS fix.
+    """
+    if isinstance(trackpoints, dict):
+        columns = dict(zip(trackpoints.get('columns', []), trackpoints.get('data', [])))
+        times = columns.get('time', [])
+        if not times:
+            return 0, None, None
+        lats = columns.get('lat')
+        lons = columns.get('lon')
+        if not lats or not lons:
+            return len(times), None, None
+        first, last = [
+            {'lat': lats[i], 'lon': lons[i]} if lats[i] is not None and lons[i] is not None else None
+            for i in (0, -1)
+        ]
+        return len(times), first, last
+
+    if not trackpoints:
+        return 0, None, None
+    return len(trackpoints), trackpoints[0].get('position'), trackpoints[-1].get('position')
+
+
+# Parts of a parsed activity file shown by a --brief summary
+_BRIEF_PREFIXES = ('date', 'metadata', 'sources.csv')
+
+
+def _load_brief(json_file):
+    """
+    Load the date, metadata and CSV source of a parsed activity file.
 
-    print(f"\n{'='*80}")
-    print(f"Date: {data['date']}")
+    With ijson installed the file is streamed and reading stops once all
+    three have been read. parse_coros_data writes them before the TCX
+    trackpoints and FIT records, which are then never decoded. When another
+    source comes first (or ijson is missing) the whole file is loaded
+    instead, since streaming through that source would cost more.
+    """
+    if ijson is None:
+        return load_json(json_file)
+
+    found = {}
+    builder = None
+    with open(json_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MIN_JSON_SIZE:
+            raise ValueError("file is empty")
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is None:
+                if prefix == 'sources' and event == 'map_key' and value != 'csv':
+                    # Not laid out the way parse_coros_data writes it
+                    return load_json(json_file)
+                if prefix not in _BRIEF_PREFIXES or event == 'map_key':
+                    continue
+                builder, target = ijson.ObjectBuilder(), prefix
+            builder.event(event, value)
+            if not builder.containers:
+                found[target] = builder.value
+                builder = None
+                if len(found) == len(_BRIEF_PREFIXES):
+                    break
+
+    if 'date' not in found:
+        return load_json(json_file)
+    data = {'date': found['date'], 'sources': {}}
+    if 'metadata' in found:
+        data['metadata'] = found['metadata']
+    if 'sources.csv' in found:
+        data['sources']['csv'] = found['sources.csv']
+    return data
+
+
+def summarize_activity(json_file, data=None, brief=False):
+    """
+    Print a summary of a single activity.
+
+    Args:
+        json_file: Parsed activity file
+        data: Already loaded contents of json_file (read from the file
+            when omitted)
+        brief: Only show the metadata, summary and splits (skip the TCX and
+            FIT sections)
+    """
+    if data is None:
+        data = _load_brief(json_file) if brief else load_json(json_file)
+
+    # Lines are collected and written in one go rather than printed one by one
+    lines = []
+    out = lines.append
+
+    # Look each source up once; a None source means the file doesn't have it
+    metadata = data.get('metadata')
+    sources = data.get('sources') or {}
+    csv_data = (sources.get('csv') or {}).get('data')
+    tcx_data = (sources.get('tcx') or {}).get('data')
+    fit_data = (sources.get('fit') or {}).get('data')
+    if brief:
+        tcx_data = fit_data = None
+
+    out(f"\n{'='*80}")
+    out(f"Date: {data['date']}")
 
     # Show title if present
-    if 'metadata' in data and data['metadata']:
-        metadata = data['metadata']
-        if metadata.get('title'):
-            print(f"Title: {metadata['title']}")
+    if metadata and metadata.get('title'):
+        out(f"Title: {metadata['title']}")
 
-    print(f"{'='*80}")
+    out(f"{'='*80}")
 
     # Metadata
-    if 'metadata' in data and data['metadata']:
-        metadata = data['metadata']
+    if metadata:
         if 'error' not in metadata:
-            print("\nMETADATA")
-            print("-" * 80)
-            print(f"  Run Type:        {metadata.get('run_type', 'N/A')}")
+            out("\nMETADATA")
+            out("-" * 80)
+            out(f"  Run Type:        {metadata.get('run_type', 'N/A')}")
             if metadata.get('title'):
-                print(f"  Title:           {metadata.get('title')}")
+                out(f"  Title:           {metadata.get('title')}")
             if metadata.get('notes'):
-                print(f"  Notes:           {metadata.get('notes')}")
+                out(f"  Notes:           {metadata.get('notes')}")
 
     # CSV Summary Data
-    if 'csv' in data['sources'] and 'data' in data['sources']['csv']:
-        csv_data = data['sources']['csv']['data']
-        if 'summary' in csv_data:
-            summary = csv_data['summary']
-            print("\nSUMMARY")
-            print("-" * 80)
-            print(f"  Distance:        {summary.get('getdistance', 'N/A')} km")
-            print(f"  Time:            {summary.get('time', 'N/A')}")
-            print(f"  Moving Time:     {summary.get('moving_time', 'N/A')}")
-            print(f"  Avg Pace:        {format_pace(summary.get('avg_pace', 'N/A'))} /km")
-            print(f"  Best Pace:       {format_pace(summary.get('best_pace', 'N/A'))} /km")
-            print(f"  Avg HR:          {summary.get('avg_hr', 'N/A')} bpm")
-            print(f"  Max HR:          {summary.get('max_hr', 'N/A')} bpm")
-            print(f"  Avg Cadence:     {summary.get('avg_run_cadence', 'N/A')} spm")
-            print(f"  Avg Stride:      {summary.get('avg_stride_length', 'N/A')} cm")
-            print(f"  Elevation Gain:  {summary.get('elevation_gain', 'N/A')} m")
-            print(f"  Elevation Loss:  {summary.get('elev_loss', 'N/A')} m")
-            print(f"  Avg Temperature: {summary.get('avg_temperature', 'N/A')} °C")
-            print(f"  Calories:        {summary.get('calories', 'N/A')} kcal")
+    if csv_data is not None:
+        summary = csv_data.get('summary')
+        if summary is not None:
+            out("\nSUMMARY")
+            out("-" * 80)
+            out(f"  Distance:        {summary.get('getdistance', 'N/A')} km")
+            out(f"  Time:            {summary.get('time', 'N/A')}")
+            out(f"  Moving Time:     {summary.get('moving_time', 'N/A')}")
+            out(f"  Avg Pace:        {format_pace(summary.get('avg_pace', 'N/A'))} /km")
+            out(f"  Best Pace:       {format_pace(summary.get('best_pace', 'N/A'))} /km")
+            out(f"  Avg HR:          {summary.get('avg_hr', 'N/A')} bpm")
+            out(f"  Max HR:          {summary.get('max_hr', 'N/A')} bpm")
+            out(f"  Avg Cadence:     {summary.get('avg_run_cadence', 'N/A')} spm")
+            out(f"  Avg Stride:      {summary.get('avg_stride_length', 'N/A')} cm")
+            out(f"  Elevation Gain:  {summary.get('elevation_gain', 'N/A')} m")
+            out(f"  Elevation Loss:  {summary.get('elev_loss', 'N/A')} m")
+            out(f"  Avg Temperature: {summary.get('avg_temperature', 'N/A')} °C")
+            out(f"  Calories:        {summary.get('calories', 'N/A')} kcal")
 
         # Split Data
-        if 'splits' in csv_data:
-            splits = csv_data['splits']
-            print(f"\nSPLITS ({len(splits)} total)")
-            print("-" * 80)
-            print(f"{'#':<4} {'Dist(km)':<10} {'Time':<12} {'Pace':<12} {'HR':<8} {'Cad':<8} {'Elev+':<8}")
-            print("-" * 80)
+        splits = csv_data.get('splits')
+        if splits is not None:
+            out(f"\nSPLITS ({len(splits)} total)")
+            out("-" * 80)
+            out(f"{'#':<4} {'Dist(km)':<10} {'Time':<12} {'Pace':<12} {'HR':<8} {'Cad':<8} {'Elev+':<8}")
+            out("-" * 80)
 
+            # One bound format call per row instead of an f-string that
+            # formats each of its seven fields separately
+            split_row = "{:<4} {:<10.2f} {:<12} {:<12} {:<8} {:<8} {:<8}".format
             for split in splits:
-                split_num = split.get('split', '?')
-                dist = split.get('getdistance', 0)
-                time = split.get('time', 'N/A')
-                pace = format_pace(split.get('avg_pace', 'N/A'))
-                hr = split.get('avg_hr', 'N/A')
-                cad = split.get('avg_run_cadence', 'N/A')
-                elev = split.get('elevation_gain', 0)
-
-                print(f"{split_num:<4} {dist:<10.2f} {time:<12} {pace:<12} {hr:<8} {cad:<8} {elev:<8}")
+                out(split_row(
+                    split.get('split', '?'),
+                    split.get('getdistance', 0),
+                    split.get('time', 'N/A'),
+                    # format_pace, inlined
+                    (split.get('avg_pace') or 'N/A').strip(),
+                    split.get('avg_hr', 'N/A'),
+                    split.get('avg_run_cadence', 'N/A'),
+                    split.get('elevation_gain', 0)
+                ))
 
     # TCX Data Info
-    if 'tcx' in data['sources'] and 'data' in data['sources']['tcx']:
-        tcx_data = data['sources']['tcx']['data']
-        print(f"\nTCX DATA")
-        print("-" * 80)
-        print(f"  Activity Type:   {tcx_data.get('activity_type', 'N/A')}")
-        print(f"  Activity ID:     {tcx_data.get('activity_id', 'N/A')}")
-        print(f"  Laps:            {len(tcx_data.get('laps', []))}")
-        print(f"  Trackpoints:     {len(tcx_data.get('trackpoints', []))} GPS points")
+    if tcx_data is not None:
+        out(f"\nTCX DATA")
+        out("-" * 80)
+        out(f"  Activity Type:   {tcx_data.get('activity_type', 'N/A')}")
+        out(f"  Activity ID:     {tcx_data.get('activity_id', 'N/A')}")
+        out(f"  Laps:            {len(tcx_data.get('laps') or ())}")
+        count, first, last = trackpoint_endpoints(tcx_data.get('trackpoints') or ())
+        out(f"  Trackpoints:     {count} GPS points")
 
         # Show first and last GPS coordinates
-        trackpoints = tcx_data.get('trackpoints', [])
-        if trackpoints:
-            first = trackpoints[0]
-            last = trackpoints[-1]
-            if 'position' in first:
-                print(f"  Start Position:  {first['position']['lat']:.6f}, {first['position']['lon']:.6f}")
-            if 'position' in last:
-                print(f"  End Position:    {last['position']['lat']:.6f}, {last['position']['lon']:.6f}")
+        if first is not None:
+            out(f"  Start Position:  {first['lat']:.6f}, {first['lon']:.6f}")
+        if last is not None:
+            out(f"  End Position:    {last['lat']:.6f}, {last['lon']:.6f}")
 
     # FIT Data Info
-    if 'fit' in data['sources'] and 'data' in data['sources']['fit']:
-        fit_data = data['sources']['fit']['data']
+    if fit_data is not None:
         if 'error' not in fit_data:
-            print(f"\nFIT DATA")
-            print("-" * 80)
-            print(f"  Records:         {len(fit_data.get('records', []))}")
-            print(f"  Laps:            {len(fit_data.get('laps', []))}")
-            print(f"  Session Data:    {len(fit_data.get('session', {}))} fields")
+            out(f"\nFIT DATA")
+            out("-" * 80)
+            out(f"  Records:         {len(fit_data.get('records') or ())}")
+            out(f"  Laps:            {len(fit_data.get('laps') or ())}")
+            out(f"  Session Data:    {len(fit_data.get('session') or ())} fields")
 
+    sys.stdout.write('\n'.join(lines) + '\n')
 
-def main():
-    """Main entry point."""
+
+def _csv_summary(json_file):
+    """
+    Return the CSV summary of a parsed activity file ({} when it has none).
+
+    With ijson installed the file is streamed and reading stops at the
+    summary, which parse_coros_data writes before the TCX trackpoints and
+    FIT records; otherwise the whole file is loaded.
+    """
+    if ijson is not None:
+        with open(json_file, 'rb') as f:
+            return next(ijson.items(f, 'sources.csv.data.summary', use_float=True), {})
+    data = load_json(json_file)
+    return data.get('sources', {}).get('csv', {}).get('data', {}).get('summary', {})
+
+
+def _list_entry(json_file):
+    """Return (date, distance, time, pace) for one line of the --list output."""
+    summary = _csv_summary(json_file)
+    return (json_file.stem, summary.get('getdistance', 'N/A'), summary.get('time', 'N/A'),
+            format_pace(summary.get('avg_pace', 'N/A')))
+
+
+def _encode_list_entries(entries):
+    """Encode --list entries as a UTF-8 JSON array of objects (newline-terminated)."""
+    rows = [{'date': date, 'distance_km': dist, 'time': time, 'avg_pace': pace}
+            for date, dist, time, pace in entries]
+    if orjson is not None:
+        return orjson.dumps(rows, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(rows, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def _list_entries(json_files, workers=None):
+    """
+    Load the --list entries of all files, in order.
+
+    Args:
+        json_files: Sorted list of parsed activity files
+        workers: Number of processes used to load files (default: one per
+            CPU when there are at least PARALLEL_MIN_FILES files; 1 = serial)
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(json_files) >= PARALLEL_MIN_FILES else 1
+    if workers <= 1:
+        return [_list_entry(json_file) for json_file in json_files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_list_entry, json_files, chunksize=16))
+
+
+# --list --cache file, kept in the parsed data directory; deliberately not a
+# .json name so it is never mistaken for an activity
+LIST_CACHE_NAME = '.list_cache'
+
+
+def _read_list_cache(data_dir):
+    """Load the --list cache of a directory ({} when missing or unreadable)."""
+    try:
+        cache = load_json(data_dir / LIST_CACHE_NAME)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_list_cache(data_dir, cache):
+    """
+    Save the --list cache.
+
+    The cache is only an optimization, so a failed write (a read-only
+    directory, or a summary value that cannot be encoded) is ignored.
+    """
+    try:
+        if orjson is not None:
+            payload = orjson.dumps(cache)
+        else:
+            payload = json.dumps(cache, ensure_ascii=False).encode('utf-8')
+        (data_dir / LIST_CACHE_NAME).write_bytes(payload)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def _cached_list_entries(data_dir, json_files, workers=None):
+    """
+    Return the --list entries of all files, in order, reusing cached entries.
+
+    Entries are cached by file name together with the file's mtime and size,
+    so only new or changed files are loaded again.
+    """
+    cache = _read_list_cache(data_dir)
+    entries = [None] * len(json_files)
+    new_cache = {}
+    stale = []
+
+    for i, json_file in enumerate(json_files):
+        stat = json_file.stat()
+        key = [stat.st_mtime_ns, stat.st_size]
+        cached = cache.get(json_file.name)
+        if isinstance(cached, list) and len(cached) == 5 and cached[:2] == key:
+            entries[i] = (json_file.stem, *cached[2:])
+            new_cache[json_file.name] = cached
+        else:
+            stale.append(i)
+            new_cache[json_file.name] = key
+
+    if stale:
+        loaded = _list_entries([json_files[i] for i in stale], workers)
+        for i, entry in zip(stale, loaded):
+            entries[i] = entry
+            new_cache[json_files[i].name] += entry[1:]
+
+    if stale or len(cache) != len(new_cache):
+        _write_list_cache(data_dir, new_cache)
+
+    return entries
+
+
+@lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command line parser (once; main() may be called repeatedly)."""
     import argparse
 
     parser = argparse.ArgumentParser(description='View parsed Coros training data')
@@ -142,8 +398,34 @@ def main():
                       help='View specific date (YYYYMMDD format)')
     parser.add_argument('--list', action='store_true',
                       help='List all available activities')
+    parser.add_argument('--json', action='store_true',
+                      help='Print the activity list as JSON (implies --list)')
+    parser.add_argument('--cache', action='store_true',
+                      help=f'With --list, keep entries in a {LIST_CACHE_NAME} file in the data '
+                           'directory and only reload new or changed files')
+    parser.add_argument('--brief', action='store_true',
+                      help='Only show metadata, summary and splits (skip TCX and FIT data)')
+    parser.add_argument('--workers', type=int, default=None,
+                      help='Number of processes for loading files with --list (default: auto, 1 = serial)')
+
+    return parser
+
+
+def _write_bytes(data: bytes):
+    """Write UTF-8 bytes to stdout, through its buffer when it has one."""
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is None:
+        # e.g. io.StringIO or an IDE console standing in for stdout
+        sys.stdout.write(data.decode('utf-8'))
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
 
-    args = parser.parse_args()
+
+def main(argv: list = None):
+    """Main entry point."""
+    args = _build_parser().parse_args(argv)
 
     data_dir = Path(args.dir)
 
@@ -152,23 +434,31 @@ def main():
         print("Run parse_coros_data.py first to generate parsed data")
         return
 
-    json_files = sorted(data_dir.glob('*.json'))
+    json_files = list_json_files(data_dir)
 
     if not json_files:
+        if args.json:
+            # Keep stdout parseable; the explanation goes to stderr
+            print(f"No JSON files found in {data_dir}", file=sys.stderr)
+            sys.stdout.write('[]\n')
+            return
         print(f"No JSON files found in {data_dir}")
         return
 
-    if args.list:
-        print(f"\nFound {len(json_files)} activities:")
-        print("-" * 80)
-        for jf in json_files:
-            with open(jf, 'r') as f:
-                data = json.load(f)
-            summary = data.get('sources', {}).get('csv', {}).get('data', {}).get('summary', {})
-            dist = summary.get('getdistance', 'N/A')
-            time = summary.get('time', 'N/A')
-            pace = format_pace(summary.get('avg_pace', 'N/A'))
-            print(f"  {jf.stem}  -  {dist} km  |  {time}  |  {pace}/km")
+    if args.list or args.json:
+        if args.cache:
+            entries = _cached_list_entries(data_dir, json_files, args.workers)
+        else:
+            entries = _list_entries(json_files, args.workers)
+
+        if args.json:
+            _write_bytes(_encode_list_entries(entries))
+            return
+
+        lines = [f"\nFound {len(json_files)} activities:", "-" * 80]
+        for date, dist, time, pace in entries:
+            lines.append(f"  {date}  -  {dist} km  |  {time}  |  {pace}/km")
+        sys.stdout.write('\n'.join(lines) + '\n')
         return
 
     if args.date:
@@ -176,11 +466,14 @@ def main():
         if not json_file.exists():
             print(f"Error: {json_file} does not exist")
             return
-        summarize_activity(json_file)
-    else:
-        # Show all activities
+        summarize_activity(json_file, brief=args.brief)
+    elif args.brief:
         for json_file in json_files:
-            summarize_activity(json_file)
+            summarize_activity(json_file, brief=True)
+    else:
+        # Show all activities, reading each file while the previous one prints
+        for json_file, raw in _prefetch(json_files):
+            summarize_activity(json_file, parse_json(raw))
 
 
 if __name__ == '__main__':